@@ -0,0 +1,385 @@
+import numpy as np
+import pandas as pd
+
+from cube import rollup
+from periods import key_labels
+
+# ----------------------------------------------
+# Vectorized Business Alert Engine (shared by app and PDF)
+# ----------------------------------------------
+
+SERIES_DIMENSIONS = ["Region", "Category"]
+OVERALL, SERIES, ALL = "overall", "series", "all"
+
+NO_DATA = "No data available for alert generation."
+ALL_PROFITABLE = "No negative profit months detected during the selected period."
+
+
+class SeriesPanel:
+    """
+    Every series to check, as (series x period) matrices per measure.
+
+    Row 0 is the whole selection; the other rows are one per combination
+    of `by` (Region / Category by default). Periods span the full range of
+    the selection, periods without sales are NaN, so all rules run as
+    array operations over every series at once.
+
+    Parameters:
+    - cells: Sliced cube cells (or any frame with the `by` columns, an int month key "Month" column and the measures)
+    - by: Dimensions that define the per-group series
+    - measures: Measures to load
+    - monthly: Optional monthly_summary() of the same cells, used as the overall row instead of rolling the cells up again
+    """
+
+    def __init__(self, cells: pd.DataFrame, by=SERIES_DIMENSIONS, measures=("Sales", "Profit"), monthly: pd.DataFrame = None):
+        overall = rollup(cells, "Month", measures) if monthly is None else monthly
+        groups = rollup(cells, list(by) + ["Month"], measures)
+
+        first, last = int(overall["Month"].min()), int(overall["Month"].max())
+        # Month keys are consecutive integers, so a key minus `first` is its column
+        self.periods = np.arange(first, last + 1)
+        self.period_labels = key_labels(self.periods, "Month")
+        key = groups[by[0]].astype(str)
+        for dim in by[1:]:
+            key = key + " / " + groups[dim].astype(str)
+        codes, names = pd.factorize(key, sort=True)
+        self.labels = [None] + list(names)
+
+        shape = (len(self.labels), len(self.periods))
+        overall_t = overall["Month"].to_numpy() - first
+        groups_t = groups["Month"].to_numpy() - first
+        self.values = {}
+        for measure in measures:
+            matrix = np.full(shape, np.nan)
+            matrix[0, overall_t] = overall[measure].to_numpy()
+            matrix[codes + 1, groups_t] = groups[measure].to_numpy()
+            self.values[measure] = matrix
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def previous_observed(matrix: np.ndarray) -> np.ndarray:
+    """Value of the last non-missing period before each period, per row."""
+    positions = np.where(~np.isnan(matrix), np.arange(matrix.shape[1]), 0)
+    last = np.maximum.accumulate(positions, axis=1)  # forward fill by position
+    filled = np.take_along_axis(matrix, last, axis=1)
+    previous = np.full_like(matrix, np.nan)
+    previous[:, 1:] = filled[:, :-1]
+    return previous
+
+
+def row_quantiles(matrix: np.ndarray, qs) -> list:
+    """
+    Per-row quantiles ignoring NaN (linear interpolation, like pandas),
+    computed for all rows at once from one sort.
+    """
+    ordered = np.sort(matrix, axis=1)  # NaN sorts last
+    counts = (~np.isnan(matrix)).sum(axis=1, keepdims=True)
+    result = []
+    for q in qs:
+        position = q * np.maximum(counts - 1, 0)
+        lo = np.floor(position).astype(np.intp)
+        hi = np.minimum(lo + 1, np.maximum(counts - 1, 0))
+        frac = position - lo
+        low, high = np.take_along_axis(ordered, lo, axis=1), np.take_along_axis(ordered, hi, axis=1)
+        result.append(np.where(counts > 0, low + (high - low) * frac, np.nan))
+    return result
+
+
+def trailing_mean_std(matrix: np.ndarray, window: int, min_periods: int):
+    """
+    Mean and sample standard deviation of the `window` periods before each
+    period (current period excluded), per row, from cumulative sums.
+    """
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+    pad = np.zeros((matrix.shape[0], 1))
+    sums = np.concatenate([pad, np.cumsum(values, axis=1)], axis=1)
+    squares = np.concatenate([pad, np.cumsum(values ** 2, axis=1)], axis=1)
+    counts = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+
+    # Window for period t covers periods [t - window, t)
+    end = np.arange(matrix.shape[1])
+    start = np.maximum(end - window, 0)
+    n = counts[:, end] - counts[:, start]
+    total = sums[:, end] - sums[:, start]
+    total_sq = squares[:, end] - squares[:, start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / n
+        var = (total_sq - total * mean) / (n - 1)
+    enough = n >= max(min_periods, 2)
+    mean = np.where(enough, mean, np.nan)
+    std = np.where(enough, np.sqrt(np.maximum(var, 0)), np.nan)
+    return mean, std
+
+
+# ------------------------------
+# Rules
+# ------------------------------
+
+class Rule:
+    """
+    One alert rule. evaluate() returns a boolean hit matrix, a severity
+    score matrix and the matrices referenced by `template`, all shaped
+    like the panel (series x period).
+
+    - level: Streamlit message type used by the app (error / warning / info)
+    - scope: Rows the rule applies to: "overall", "series" or "all"
+    - template: Message with {where} plus any of the returned fields
+    - reference: Field holding what a value is compared against (e.g. the
+      previous period); per-series hits must differ from it by a material
+      share of the selection's `measure` (see AlertEngine)
+    - trigger: Score at which the rule fires; per-series hits of different
+      rules are ranked by score / trigger
+    """
+    name = "rule"
+    level = "warning"
+    scope = ALL
+    template = "{where}"
+    reference = None
+    trigger = 1.0
+
+    def evaluate(self, panel: SeriesPanel):
+        raise NotImplementedError
+
+
+class LossRule(Rule):
+    """Periods with negative profit."""
+    name, level, scope = "loss", "error", OVERALL
+    template = "Loss recorded in {where} -> Profit: ${profit:,.0f}"
+
+    def evaluate(self, panel):
+        profit = panel.values["Profit"]
+        return profit < 0, -profit, {"profit": profit}
+
+
+class ProfitDropRule(Rule):
+    """Profit fell by more than `threshold` dollars since the previous period."""
+    name, level, scope = "profit_drop", "warning", OVERALL
+    template = "Sharp profit decline in {where} -> Drop: ${drop:,.0f}"
+
+    def __init__(self, threshold=5000):
+        self.threshold = threshold
+
+    def evaluate(self, panel):
+        profit = panel.values["Profit"]
+        change = profit - previous_observed(profit)
+        return change < -self.threshold, -change, {"drop": np.abs(change)}
+
+
+class IQROutlierRule(Rule):
+    """Sales outside the series' own 1.5 x IQR fences."""
+    name, level, scope = "iqr_outlier", "info", OVERALL
+    template = "Unusual sales in {where} -> Sales: ${sales:,.0f}"
+
+    def __init__(self, measure="Sales", k=1.5):
+        self.measure = measure
+        self.k = k
+
+    def evaluate(self, panel):
+        values = panel.values[self.measure]
+        q1, q3 = row_quantiles(values, [0.25, 0.75])
+        iqr = q3 - q1
+        upper, lower = q3 + self.k * iqr, q1 - self.k * iqr
+        hits = (values > upper) | (values < lower)
+        score = np.maximum(values - upper, lower - values) / np.where(iqr > 0, iqr, 1)
+        return hits, score, {"sales": values}
+
+
+class RollingZScoreRule(Rule):
+    """Value more than `threshold` standard deviations from its trailing `window`-period mean."""
+    name, level, scope = "rolling_zscore", "warning", ALL
+    template = "{measure} anomaly in {where} -> ${value:,.0f} (z = {z:+.1f} vs prior {window} periods)"
+    reference = "mean"
+
+    def __init__(self, measure="Sales", window=6, threshold=3.0):
+        self.measure = measure
+        self.window = window
+        self.threshold = self.trigger = threshold
+
+    def evaluate(self, panel):
+        values = panel.values[self.measure]
+        mean, std = trailing_mean_std(values, self.window, min_periods=max(3, self.window // 2))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (values - mean) / std
+        # Flat windows leave float residue in std; ignore them rather than report huge z
+        hits = (np.abs(z) > self.threshold) & (std > 1e-6 * np.maximum(np.abs(mean), 1))
+        return hits, np.abs(z), {
+            "value": values, "mean": mean, "z": z, "measure": self.measure, "window": self.window,
+        }
+
+
+class SeasonalDeviationRule(Rule):
+    """Value deviates more than `tolerance` (fraction) from the same period one season earlier."""
+    name, level, scope = "seasonal_deviation", "info", ALL
+    template = "{measure} in {where} {deviation:+.0%} vs same period last season (${value:,.0f} vs ${baseline:,.0f})"
+    reference = "baseline"
+
+    def __init__(self, measure="Sales", season=12, tolerance=0.5, min_baseline=1000):
+        self.measure = measure
+        self.season = season
+        self.tolerance = self.trigger = tolerance
+        self.min_baseline = min_baseline
+
+    def evaluate(self, panel):
+        values = panel.values[self.measure]
+        baseline = np.full_like(values, np.nan)
+        if values.shape[1] > self.season:
+            baseline[:, self.season:] = values[:, :-self.season]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deviation = (values - baseline) / np.abs(baseline)
+        hits = (np.abs(deviation) > self.tolerance) & (np.abs(baseline) >= self.min_baseline)
+        return hits, np.abs(deviation), {
+            "value": values, "baseline": baseline, "deviation": deviation, "measure": self.measure,
+        }
+
+
+class PctChangeRule(Rule):
+    """Value fell by at least `threshold` (fraction) since the previous period."""
+    name, level, scope = "pct_change", "warning", ALL
+    template = "{measure} fell {change:.0%} in {where} -> ${value:,.0f} (from ${previous:,.0f})"
+    reference = "previous"
+
+    def __init__(self, measure="Sales", threshold=0.5, min_previous=1000):
+        self.measure = measure
+        self.threshold = self.trigger = threshold
+        self.min_previous = min_previous
+
+    def evaluate(self, panel):
+        values = panel.values[self.measure]
+        previous = previous_observed(values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (values - previous) / np.abs(previous)
+        hits = (change <= -self.threshold) & (previous >= self.min_previous)
+        return hits, -change, {
+            "value": values, "previous": previous, "change": np.abs(change), "measure": self.measure,
+        }
+
+
+def default_rules() -> list:
+    """The rules the dashboard and the PDF report run, in display order."""
+    return [
+        LossRule(),
+        ProfitDropRule(threshold=5000),
+        IQROutlierRule(),
+        RollingZScoreRule(),
+        SeasonalDeviationRule(),
+        PctChangeRule(),
+    ]
+
+
+# ------------------------------
+# Engine
+# ------------------------------
+
+class AlertEngine:
+    """
+    Runs every rule over a SeriesPanel and turns hits into alerts.
+
+    Each alert is a dict with rule, level, series (None for the whole
+    selection), period, score, text (plain, for the PDF) and markdown
+    (for the app). Hits on the overall series come first, per rule in time
+    order. Per-series hits follow, and only material ones count: the value
+    must differ from the rule's reference by at least `min_series_impact`
+    of the whole selection's value in that period, so a small series
+    swinging wildly (a huge z on a few hundred dollars) is not reported.
+    They are ranked across all rules by score relative to each rule's
+    trigger, and `max_series_alerts` are kept in total, so a broad
+    selection can't flood the page.
+
+    Parameters:
+    - rules: Rule instances (default_rules() if omitted)
+    - max_series_alerts: Per-series alerts kept, across all rules
+    - min_series_impact: Smallest change, as a share of the selection's value, a per-series alert needs
+    """
+
+    def __init__(self, rules=None, max_series_alerts=5, min_series_impact=0.02):
+        self.rules = default_rules() if rules is None else rules
+        self.max_series_alerts = max_series_alerts
+        self.min_series_impact = min_series_impact
+
+    def evaluate(self, panel: SeriesPanel) -> list:
+        row = np.arange(len(panel))
+        in_scope = {
+            OVERALL: row == 0,
+            SERIES: row > 0,
+            # A selection with a single Region / Category series: that row
+            # repeats the overall one, so "all" rules only report it once
+            ALL: row == 0 if len(panel) == 2 else np.ones(len(panel), dtype=bool),
+        }
+        alerts, candidates = [], []
+        for rule in self.rules:
+            with np.errstate(invalid="ignore"):
+                hits, score, fields = rule.evaluate(panel)
+                hits = hits & in_scope[rule.scope][:, None]
+                if rule.reference is not None:
+                    # Row 0 is the selection itself, always material
+                    hits[1:] &= self._material(rule, panel, fields)[1:]
+
+            rows, cols = np.nonzero(hits)
+            overall = rows == 0
+            for i in np.flatnonzero(overall):
+                alerts.append(self._alert(rule, panel, rows[i], cols[i], score, fields))
+
+            # This rule's best series hits; no more than the overall cap can make it
+            series_rows, series_cols = rows[~overall], cols[~overall]
+            rank = score[series_rows, series_cols] / rule.trigger
+            for i in np.argsort(-rank, kind="stable")[:self.max_series_alerts]:
+                candidates.append((rank[i], rule, series_rows[i], series_cols[i], score, fields))
+
+        candidates.sort(key=lambda candidate: -candidate[0])
+        for _, rule, row, col, score, fields in candidates[:self.max_series_alerts]:
+            alerts.append(self._alert(rule, panel, row, col, score, fields))
+        return alerts
+
+    def _material(self, rule, panel, fields) -> np.ndarray:
+        """Cells whose change from the rule's reference is at least `min_series_impact` of the selection's value."""
+        change = np.abs(fields["value"] - fields[rule.reference])
+        selection = np.abs(panel.values[rule.measure][0])
+        return change >= self.min_series_impact * selection
+
+    @staticmethod
+    def _alert(rule, panel, row, col, score, fields):
+        period = panel.period_labels[col]
+        series = panel.labels[row]
+        where = period if series is None else f"{period} ({series})"
+        values = {
+            name: field[row, col] if isinstance(field, np.ndarray) else field
+            for name, field in fields.items()
+        }
+        return {
+            "rule": rule.name,
+            "level": rule.level,
+            "series": series,
+            "period": period,
+            "score": float(score[row, col]),
+            "text": rule.template.format(where=where, **values),
+            "markdown": rule.template.format(where=f"**{where}**", **values),
+        }
+
+
+def business_alerts(cells: pd.DataFrame, engine: AlertEngine = None, monthly: pd.DataFrame = None) -> list:
+    """
+    Alerts for a filtered selection, used by both the dashboard and the PDF.
+
+    Parameters:
+    - cells: Sliced cube cells (SalesCube.slice()) or row-level data with an int month key "Month" column
+    - engine: Optional AlertEngine with a custom rule set
+    - monthly: Optional monthly_summary() of the same cells, reused for the overall series
+    """
+    if cells is None or cells.empty:
+        return [_message("info", NO_DATA)]
+
+    panel = SeriesPanel(cells, monthly=monthly)
+    alerts = (engine or AlertEngine()).evaluate(panel)
+
+    profit = panel.values["Profit"][0]
+    if (profit[~np.isnan(profit)] > 0).all():
+        alerts.append(_message("success", ALL_PROFITABLE))
+    return alerts
+
+
+def _message(level, text):
+    return {"rule": None, "level": level, "series": None, "period": None, "score": 0.0,
+            "text": text, "markdown": text}
@@ -20,10 +20,21 @@ import locale  # for formatting currency
 # Styling / HTML
 import streamlit.components.v1 as components
 from generate_report import generate_pdf_report, save_chart_image
-from generate_report import generate_alerts
+from alert_engine import business_alerts
+from data_store import load_superstore, DERIVED_COLUMNS, PERIOD_KEY_COLUMNS
+from cube import SalesCube, CustomerSketchCube, rollup, monthly_summary, period_summary
+from periods import GRANULARITIES, ADJECTIVES, AXIS_TITLES, key_starts, month_to_quarter
+from filter_engine import BitmapIndex
+from result_cache import ResultCache, filter_signature
+from lookup_index import LookupIndex
+from customer_table import CustomerTable, RANK_MEASURES
+from exports import EXPORT_FORMATS, build_export
+from email_queue import EmailDispatcher
+from report_jobs import ReportJobManager, QueueFullError
+from chart_render import ChartRasterizer
+from downsample import DEFAULT_WIDTH_PX, downsample_frame, scatter_trace
+from instrumentation import MetricsCollector
 import os
-import smtplib
-from email.message import EmailMessage
 import re
 from datetime import datetime
 ## Lets Set Page Layout + Load Data
@@ -36,14 +47,97 @@ st.markdown("<p style='text-align: center; color: #7f8c8d;'>Interactive Business
 st.markdown("---")
 
 st.caption("Last updated: July 6, 2025")
-@st.cache_data
+@st.cache_resource
+def load_metrics():
+    # Per-section rerun timings; set DASHBOARD_METRICS_JSONL / DASHBOARD_METRICS_PROM to export them
+    return MetricsCollector(
+        jsonl_path=os.environ.get("DASHBOARD_METRICS_JSONL"),
+        prom_path=os.environ.get("DASHBOARD_METRICS_PROM"),
+        trace_memory=os.environ.get("DASHBOARD_TRACEMALLOC") == "1",
+    )
+
+metrics = load_metrics()
+profile = metrics.profile()
+profile.start("load_data")
+
+# cache_resource keeps one memory-mapped frame per process instead of
+# unpickling a private copy for every rerun
+@st.cache_resource
 def load_data():
-    df = pd.read_csv("Batch2/Task5/cleaned_global_superstore.csv", sep=",")
-    df.columns = df.columns.str.strip()
-    df["Order Date"] = pd.to_datetime(df["Order Date"], dayfirst=False, errors="coerce")
-    return df
+    # Converts the CSV to Arrow on first run, then memory-maps the Arrow file
+    return load_superstore()
+
+@st.cache_resource
+def load_cube():
+    # Region x Category x Sub-Category x Segment x Month sums, built once per process
+    return SalesCube(load_data())
+
+@st.cache_resource
+def load_customer_sketches():
+    # HyperLogLog sketches of Customer ID per Region x Category x Sub-Category x Month;
+    # DASHBOARD_HLL_PRECISION trades memory for accuracy (11 -> about 2.3% error)
+    return CustomerSketchCube(load_data(), precision=int(os.environ.get("DASHBOARD_HLL_PRECISION", "11")))
+
+@st.cache_resource
+def load_filter_index():
+    # Packed per-value bitmaps for Region, Category and Sub-Category
+    return BitmapIndex(load_data())
+
+@st.cache_resource
+def load_lookup_index():
+    # Customer name / sub-category -> row positions, plus sorted name lists
+    return LookupIndex(load_data())
+
+@st.cache_resource
+def load_customer_table():
+    # Per-row customer codes plus whole-dataset Sales / Profit / Orders per customer
+    return CustomerTable(load_data())
+
+@st.cache_resource
+def load_result_cache():
+    # One LRU cache shared by all sessions; size it with DASHBOARD_CACHE_MB
+    max_mb = float(os.environ.get("DASHBOARD_CACHE_MB", "256"))
+    return ResultCache(max_bytes=int(max_mb * 1024 * 1024))
+
+@st.cache_resource
+def load_report_cache():
+    # Rendered PDFs keyed by a hash of their KPI / insight / alert content
+    max_mb = float(os.environ.get("DASHBOARD_REPORT_CACHE_MB", "64"))
+    return ResultCache(max_bytes=int(max_mb * 1024 * 1024))
+
+@st.cache_resource
+def load_chart_rasterizer():
+    # Report charts render to PNG in parallel; PNGs are cached by figure hash
+    max_mb = float(os.environ.get("DASHBOARD_CHART_CACHE_MB", "64"))
+    return ChartRasterizer(
+        max_workers=int(os.environ.get("DASHBOARD_CHART_WORKERS", "3")),
+        cache=ResultCache(max_bytes=int(max_mb * 1024 * 1024)),
+    )
+
+@st.cache_resource
+def load_report_jobs():
+    # PDF rendering runs in a process pool; size it for heavy report days
+    return ReportJobManager(
+        max_workers=int(os.environ.get("DASHBOARD_REPORT_WORKERS", "2")),
+        max_queue=int(os.environ.get("DASHBOARD_REPORT_QUEUE", "16")),
+        cache=load_report_cache(),
+        rasterizer=load_chart_rasterizer(),
+    )
 
 df = load_data()
+cube = load_cube()
+customer_sketches = load_customer_sketches()
+filter_index = load_filter_index()
+lookup_index = load_lookup_index()
+customer_table = load_customer_table()
+result_cache = load_result_cache()
+report_jobs = load_report_jobs()
+
+# File exports run on download click; each one is recorded as its own "export" profile
+timed_export = metrics.timed("export")(build_export)
+# Exports keep the dataset's original columns (no derived ones)
+EXPORT_COLUMNS = [col for col in df.columns if col not in DERIVED_COLUMNS]
+profile.start("filtering")
 ## Lets add Sidebar Filters
 
 # Sidebar title
@@ -59,7 +153,8 @@ selected_category = st.sidebar.multiselect("Select Category", categories)
 
 # Sub-Category (depends on selected Category)
 if selected_category:
-    available_subcats = df[df["Category"].isin(selected_category)]["Sub-Category"].unique()
+    # Only the Sub-Category column is masked: the shared frame is never copied row-wise
+    available_subcats = df["Sub-Category"][df["Category"].isin(selected_category)].unique()
 else:
     available_subcats = df["Sub-Category"].unique()
 
@@ -80,30 +175,82 @@ else:
 st.sidebar.markdown("### Trend Chart Options")
 
 trend_mode = st.sidebar.radio("Chart Type", ["Single Axis", "Dual Axis"])
+trend_granularity = st.sidebar.selectbox("Granularity", GRANULARITIES, index=GRANULARITIES.index("Month"))
 show_margin = st.sidebar.checkbox("Show Profit Margin %", value=True)
-## Lets Apply Filters to DataFrame
-# Filter data based on sidebar inputs
-filtered_df = df.copy()
-
-if selected_region:
-    filtered_df = filtered_df[filtered_df["Region"].isin(selected_region)]
 
-if selected_category:
-    filtered_df = filtered_df[filtered_df["Category"].isin(selected_category)]
+st.sidebar.markdown("### KPI Options")
+exact_customers = st.sidebar.checkbox(
+    "Exact Unique Customers (audit)",
+    value=False,
+    help=f"Off: estimated from precomputed HyperLogLog sketches "
+         f"(typically within ±{customer_sketches.relative_error():.1%}). On: counts every selected customer ID.",
+)
+## Lets Apply Filters to DataFrame
+def compute_filter_results():
+    """Filtered row set plus every aggregate that depends only on the filters."""
+    # Resolve the sidebar inputs to row positions through the bitmap index
+    rows = filter_index.select(
+        {
+            "Region": selected_region,
+            "Category": selected_category,
+            "Sub-Category": selected_subcat,
+        },
+        start_date,
+        end_date,
+    )
 
-if selected_subcat:
-    filtered_df = filtered_df[filtered_df["Sub-Category"].isin(selected_subcat)]
+    # Same selection, answered from the pre-aggregated cube (KPIs & summary charts)
+    cells = cube.slice(selected_region, selected_category, selected_subcat, start_date, end_date)
+    monthly = monthly_summary(cells)
+
+    return {
+        "rows": rows,
+        "cube_cells": cells,
+        # Month-level Sales / Profit / Margin %, shared by insights, alerts, trend chart and PDF
+        "monthly": monthly,
+        # Alert engine output, shared by the Business Alerts panel and the PDF
+        "alerts": business_alerts(cells, monthly=monthly),
+        "segment_perf": rollup(cells, "Segment").sort_values("Sales", ascending=False),
+        "subcat_perf": rollup(cells, "Sub-Category"),
+        "category_sales": rollup(cells, "Category", ["Sales"]).sort_values("Sales", ascending=False),
+        "subcat_sales": rollup(cells, ["Category", "Sub-Category"], ["Sales"]),
+        "row_count": rows.stop - rows.start if isinstance(rows, slice) else len(rows),
+        # Merged per-cell HyperLogLog sketches; the exact count is only run in audit mode
+        "unique_customers": customer_sketches.count(
+            selected_region, selected_category, selected_subcat, start_date, end_date
+        ),
+        # Per-customer totals; any top-N / ranking is picked from these per rerun
+        "customer_totals": customer_table.totals(rows),
+        # Sorted names for the lookup dropdowns
+        "customer_names": lookup_index.names_in("Customer Name", rows),
+        "product_names": lookup_index.names_in("Sub-Category", rows),
+    }
 
-filtered_df = filtered_df[
-    (filtered_df["Order Date"] >= pd.to_datetime(start_date)) &
-    (filtered_df["Order Date"] <= pd.to_datetime(end_date))
-]
+# Identical filter sets (e.g. only "Chart Type" toggled) are served from the shared cache
+filter_key = filter_signature(selected_region, selected_category, selected_subcat, start_date, end_date)
+results = result_cache.get_or_compute(filter_key, compute_filter_results)
+
+# Sessions keep only row positions into the shared, read-only df; a frame for
+# the selection is built only where rows are actually needed (e.g. exports)
+selected_count = results["row_count"]
+profile.rows(selected_count)
+cube_cells = results["cube_cells"]
+monthly = results["monthly"]
+profile.start("kpis")
 ## Lets add KPI Cards (with Light CSS)
 # --- KPI Section ---
-total_sales = filtered_df["Sales"].sum()
-total_profit = filtered_df["Profit"].sum()
-total_orders = filtered_df.shape[0]
-unique_customers = filtered_df["Customer ID"].nunique()
+total_sales = cube_cells["Sales"].sum()
+total_profit = cube_cells["Profit"].sum()
+total_orders = int(cube_cells["Orders"].sum())
+if exact_customers:
+    unique_customers = result_cache.get_or_compute(
+        f"{filter_key}:exact_customers",
+        lambda: df["Customer ID"].iloc[results["rows"]].nunique(),
+    )
+    unique_customers_label = f"{unique_customers:,}"
+else:
+    unique_customers = results["unique_customers"]
+    unique_customers_label = f"~{unique_customers:,}"
 
 # --- CSS STYLES ---
 st.markdown("""
@@ -197,10 +344,11 @@ with col4:
     st.markdown(f"""
     <div class='kpi-card'>
         <div class='kpi-title'><i class="fas fa-users"></i>Unique Customers</div>
-        <div class='kpi-value'>{unique_customers:,}</div>
+        <div class='kpi-value'>{unique_customers_label}</div>
     </div>
     """, unsafe_allow_html=True)
 
+profile.start("insights")
 ## Lets add Auto-Generated Insights Panel
 # -------------------------------
 # Auto-Generated Insights Panel
@@ -209,40 +357,22 @@ with col4:
 st.markdown("### Business Insights")
 
 # Only show if data is not empty
-if not filtered_df.empty:
+if selected_count:
     # Best sales month
-    monthly_sales = (
-        filtered_df.groupby(filtered_df["Order Date"].dt.to_period("M"))["Sales"]
-        .sum()
-        .reset_index()
-    )
-    best_month = str(monthly_sales.loc[monthly_sales["Sales"].idxmax(), "Order Date"])
+    best_month = monthly.loc[monthly["Sales"].idxmax(), "Month_Year"]
 
     # Worst profit month
-    monthly_profit = (
-        filtered_df.groupby(filtered_df["Order Date"].dt.to_period("M"))["Profit"]
-        .sum()
-        .reset_index()
-    )
-    worst_profit_month = str(monthly_profit.loc[monthly_profit["Profit"].idxmin(), "Order Date"])
+    worst_profit_month = monthly.loc[monthly["Profit"].idxmin(), "Month_Year"]
 
     # Top Sub-Category by Sales
-    top_subcat = (
-        filtered_df.groupby("Sub-Category")["Sales"]
-        .sum()
-        .idxmax()
-    )
+    subcat_perf = results["subcat_perf"]
+    top_subcat = subcat_perf.loc[subcat_perf["Sales"].idxmax(), "Sub-Category"]
 
     # Average revenue per order
-    avg_rev_per_order = filtered_df["Sales"].sum() / len(filtered_df)
+    avg_rev_per_order = total_sales / total_orders
 
     # Sub-Categories with Net Loss
-    loss_subcats = (
-        filtered_df.groupby("Sub-Category")["Profit"]
-        .sum()
-        .reset_index()
-    )
-    loss_subcats = loss_subcats[loss_subcats["Profit"] < 0]["Sub-Category"].tolist()
+    loss_subcats = subcat_perf[subcat_perf["Profit"] < 0]["Sub-Category"].tolist()
 
     # Display insights
     st.markdown(f"""
@@ -255,6 +385,7 @@ if not filtered_df.empty:
 else:
     st.warning("No data available with current filters to generate insights.")
 
+profile.start("alerts", rows=len(results["alerts"]))
 ## Lets add Business Insight Alerts
 # -------------------------------
 # Business Alerts & Anomaly Detection (BI-style)
@@ -262,58 +393,16 @@ else:
 
 st.markdown("### Business Alerts")
 
-# Ensure Month-Year column exists
-filtered_df["Month_Year"] = filtered_df["Order Date"].dt.to_period("M").astype(str)
-
-# Monthly Aggregation
-monthly_data = (
-    filtered_df.groupby("Month_Year")[["Sales", "Profit"]]
-    .sum()
-    .reset_index()
-    .sort_values("Month_Year")
-)
-
-# 1. Detect Loss Months (Profit < 0)
-loss_months = monthly_data[monthly_data["Profit"] < 0]
-
-if not loss_months.empty:
-    for _, row in loss_months.iterrows():
-        st.error(f"Loss recorded in **{row['Month_Year']}** -> Profit: ${row['Profit']:,.0f}")
-
-# 2. Detect Sharp Profit Declines
-monthly_data["Profit_Change"] = monthly_data["Profit"].diff()
-
-sharp_drops = monthly_data[monthly_data["Profit_Change"] < -5000]  # Adjust threshold as needed
-
-for _, row in sharp_drops.iterrows():
-    st.warning(f"Sharp profit decline in **{row['Month_Year']}** -> Drop: ${abs(row['Profit_Change']):,.0f}")
-
-# 3. Detect Sales Outlier (using IQR method)
-q1 = monthly_data["Sales"].quantile(0.25)
-q3 = monthly_data["Sales"].quantile(0.75)
-iqr = q3 - q1
-upper_bound = q3 + 1.5 * iqr
-lower_bound = q1 - 1.5 * iqr
-
-outliers = monthly_data[(monthly_data["Sales"] > upper_bound) | (monthly_data["Sales"] < lower_bound)]
-
-for _, row in outliers.iterrows():
-    st.info(f"Unusual sales in **{row['Month_Year']}** -> Sales: ${row['Sales']:,.0f}")
-
-# 4. Positive Streak Detection
-if (monthly_data["Profit"] > 0).all():
-    st.success("No negative profit months detected in selected period.")
+# Vectorized rules over the whole selection and every Region / Category series
+for alert in results["alerts"]:
+    getattr(st, alert["level"])(alert["markdown"])
 
+profile.start("segment_insight")
 # -------------------------------
 # Best Performing Segment Insight
 # -------------------------------
 
-segment_perf = (
-    filtered_df.groupby("Segment")[["Sales", "Profit"]]
-    .sum()
-    .reset_index()
-    .sort_values("Sales", ascending=False)
-)
+segment_perf = results["segment_perf"]
 best_segment = segment_perf.sort_values("Sales", ascending=False).iloc[0]
 
 st.markdown(f"""
@@ -323,36 +412,35 @@ st.markdown(f"""
 - **Profit:** ${best_segment['Profit']:,.0f}
 """)
 
+profile.start("lookup")
 # -------------------------------
 # Customer/Product Lookup Tool
 # -------------------------------
 
 st.sidebar.markdown("### Lookup")
 
-# Unique names
-all_customers = sorted(filtered_df["Customer Name"].dropna().unique())
-all_products = sorted(filtered_df["Sub-Category"].dropna().unique()) 
+# Unique names (pre-sorted, cached per filter set)
+all_customers = results["customer_names"]
+all_products = results["product_names"]
 
 # Add dropdowns (empty by default)
 selected_customer = st.sidebar.selectbox("Select Customer", [""] + all_customers)
 selected_product = st.sidebar.selectbox("Select Product", [""] + all_products)
 
-# Initialize filter flag
-filtered_result = False
-
-# Filter based on input
-lookup_df = filtered_df.copy()
+# Filter flag
+filtered_result = bool(selected_customer or selected_product)
 
-if selected_customer:
-    lookup_df = lookup_df[lookup_df["Customer Name"] == selected_customer]
-    filtered_result = True
+LOOKUP_EXPORT_COLUMNS = ["Order Date", "Customer Name", "Sub-Category", "Sales", "Profit", "Region", "City"]
 
-if selected_product:
-    lookup_df = lookup_df[lookup_df["Sub-Category"] == selected_product]
-    filtered_result = True
+# Filter based on input: intersect the customer/product row lists with the active filter.
+# Rows are only copied out of the shared frame while a lookup is active, and
+# only the columns the panel shows.
+lookup_rows = lookup_index.lookup(results["rows"], selected_customer, selected_product)
+lookup_df = df.iloc[lookup_rows, df.columns.get_indexer(LOOKUP_EXPORT_COLUMNS)] if len(lookup_rows) else None
+profile.rows(len(lookup_rows))
 
 # Display results only if something selected
-if filtered_result and not lookup_df.empty:
+if filtered_result and lookup_df is not None:
     st.markdown("#### Lookup Results")
 
     # Sales summary
@@ -369,60 +457,54 @@ if filtered_result and not lookup_df.empty:
 
     # Show detailed table
     st.markdown("#### Matching Transactions")
-    st.dataframe(lookup_df[["Order Date", "Customer Name", "Sub-Category", "Sales", "Profit", "Region", "City"]].sort_values("Order Date"))
+    st.dataframe(lookup_df.sort_values("Order Date"))
 
-elif filtered_result and lookup_df.empty:
+elif filtered_result:
     st.warning("No matching transactions found for selected customer/product.")
 
 # -------------------------------
 # CSV Download for Lookup Result
 # -------------------------------
 
-@st.cache_data
-def convert_lookup_df_to_csv(df):
-    return df.to_csv(index=False).encode('utf-8-sig')
-
-csv_lookup = convert_lookup_df_to_csv(
-    lookup_df[["Order Date", "Customer Name", "Sub-Category", "Sales", "Profit", "Region", "City"]]
-)
-st.sidebar.download_button(
-    label="⬇️ Download Transactions CSV",
-    data=csv_lookup,
-    file_name="lookup_transactions.csv",
-    mime='text/csv',
-    use_container_width=False
-)
-## lets plot Top 5 Customers by Sales — Plotly Bar Chart
+# Offered only for an active lookup; the CSV is built (in chunks) when the button is clicked
+if lookup_df is not None:
+    st.sidebar.download_button(
+        label="⬇️ Download Transactions CSV",
+        data=lambda rows=lookup_rows: timed_export(df, rows, "CSV", columns=LOOKUP_EXPORT_COLUMNS),
+        file_name="lookup_transactions.csv",
+        mime='text/csv',
+        use_container_width=False
+    )
+profile.start("top_customers")
+## lets plot Top N Customers — Plotly Bar Chart
 # -----------------------
-# Top 5 Customers by Sales
+# Top N Customers (Sales / Profit / Orders)
 # -----------------------
 
-st.markdown("### Top 5 Customers by Sales")
+col_n, col_by = st.columns(2)
+top_n = col_n.selectbox("Show Top", [5, 10, 25, 50, 100], index=0)
+rank_by = col_by.selectbox("Rank Customers By", RANK_MEASURES, index=0)
 
-# Group and sort data
-top_customers = (
-    filtered_df.groupby("Customer Name")["Sales"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(5)
-    .reset_index()
-)
+st.markdown(f"### Top {top_n} Customers by {rank_by}")
+
+# Partial selection over the per-customer totals cached for this filter set
+top_customers = customer_table.top(results["customer_totals"], top_n, rank_by)
 
 # Plotly Bar Chart
 fig_top_customers = px.bar(
     top_customers,
     x="Customer Name",
-    y="Sales",
-    text="Sales",
-    color="Sales",
+    y=rank_by,
+    text=rank_by,
+    color=rank_by,
     color_continuous_scale="Blues",
-    title="Top 5 Customers by Total Sales",
+    title=f"Top {top_n} Customers by Total {rank_by}",
 )
 
 fig_top_customers.update_traces(texttemplate='%{text:.2s}', textposition='auto')
 fig_top_customers.update_layout(
     xaxis_title="Customer",
-    yaxis_title="Total Sales",
+    yaxis_title=f"Total {rank_by}",
     coloraxis_showscale=False,
     template="plotly_white",
     height=400
@@ -431,6 +513,7 @@ fig_top_customers.update_layout(
 # Show chart
 st.plotly_chart(fig_top_customers, use_container_width=True)
 
+profile.start("segment_kpis")
 # -------------------------------
 # Segment-Level KPIs
 # -------------------------------
@@ -447,33 +530,56 @@ for i, seg in enumerate(segment_perf["Segment"]):
     col.metric(label=f"{seg} - Sales", value=f"${seg_sales:,.0f}")
     col.metric(label=f"{seg} - Profit", value=f"${seg_profit:,.0f}")
 
+profile.start("trend_chart")
 # -------------------------------
-# Monthly Sales Trend Chart (Toggle: Single vs Dual Axis)
+# Sales Trend Chart (Toggle: Single vs Dual Axis, Day / Week / Month / Quarter)
 # -------------------------------
 
-st.markdown("### Monthly Sales Trend Analysis")
+st.markdown(f"### {ADJECTIVES[trend_granularity]} Sales Trend Analysis")
 
-# Ensure Month-Year column
-filtered_df["Month_Year"] = filtered_df["Order Date"].dt.to_period("M").astype(str)
+def compute_trend_periods():
+    """Sales / Profit / Margin % per period at the selected granularity."""
+    if trend_granularity == "Quarter":
+        # Quarter key = month key // 3, rolled up from the sliced cube cells
+        return period_summary(
+            month_to_quarter(cube_cells["Month"].to_numpy()),
+            cube_cells["Sales"], cube_cells["Profit"], "Quarter",
+        )
+    # Day / Week: sum the selected rows by their precomputed int32 keys
+    rows = results["rows"]
+    return period_summary(
+        df[PERIOD_KEY_COLUMNS[trend_granularity]].to_numpy()[rows],
+        df["Sales"].to_numpy()[rows], df["Profit"].to_numpy()[rows], trend_granularity,
+    )
 
-# Group by Month-Year
-trend_data = (
-    filtered_df.groupby("Month_Year")[["Sales", "Profit"]]
-    .sum()
-    .reset_index()
-    .sort_values("Month_Year")
+if trend_granularity == "Month":
+    # The shared monthly frame (already includes Profit Margin %)
+    trend_periods = monthly.rename(columns={"Month": "Key", "Month_Year": "Period"})
+else:
+    trend_periods = result_cache.get_or_compute(f"{filter_key}:trend:{trend_granularity}", compute_trend_periods)
+
+# Thinned to about one point per pixel when long; Profit keeps every
+# bucket's dip so loss periods stay visible
+trend_data = downsample_frame(
+    trend_periods,
+    shape_columns=["Sales", "Margin %"] if show_margin else ["Sales"],
+    extrema_columns=["Profit"],
+    width_px=int(os.environ.get("DASHBOARD_CHART_WIDTH_PX", DEFAULT_WIDTH_PX)),
 )
-
-# Profit Margin %
-trend_data["Margin %"] = (trend_data["Profit"] / trend_data["Sales"]) * 100
+if len(trend_data) < len(trend_periods):
+    # Dropped points must not close the gaps, so use a real time axis
+    trend_x = key_starts(trend_data["Key"], trend_granularity)
+else:
+    trend_x = trend_data["Period"]
+trend_trace = scatter_trace(len(trend_data))
 
 # --------- SINGLE AXIS ---------
 if trend_mode == "Single Axis":
     fig_trend = go.Figure()
 
     # Sales
-    fig_trend.add_trace(go.Scatter(
-        x=trend_data["Month_Year"],
+    fig_trend.add_trace(trend_trace(
+        x=trend_x,
         y=trend_data["Sales"],
         name="Sales",
         mode="lines+markers",
@@ -481,8 +587,8 @@ if trend_mode == "Single Axis":
     ))
 
     # Profit
-    fig_trend.add_trace(go.Scatter(
-        x=trend_data["Month_Year"],
+    fig_trend.add_trace(trend_trace(
+        x=trend_x,
         y=trend_data["Profit"],
         name="Profit",
         mode="lines+markers",
@@ -491,8 +597,8 @@ if trend_mode == "Single Axis":
 
     # Margin %
     if show_margin:
-        fig_trend.add_trace(go.Scatter(
-            x=trend_data["Month_Year"],
+        fig_trend.add_trace(trend_trace(
+            x=trend_x,
             y=trend_data["Margin %"],
             name="Margin %",
             mode="lines+markers",
@@ -511,7 +617,7 @@ if trend_mode == "Single Axis":
         )
 
     fig_trend.update_layout(
-        xaxis_title="Month-Year",
+        xaxis_title=AXIS_TITLES[trend_granularity],
         yaxis_title="Amount ($)",
         hovermode="x unified",
         legend_title="Metric",
@@ -529,8 +635,8 @@ else:
     fig_dual = go.Figure()
 
     # Sales (Left)
-    fig_dual.add_trace(go.Scatter(
-        x=trend_data["Month_Year"],
+    fig_dual.add_trace(trend_trace(
+        x=trend_x,
         y=trend_data["Sales"],
         name="Sales",
         mode="lines+markers",
@@ -539,8 +645,8 @@ else:
     ))
 
     # Profit (Right)
-    fig_dual.add_trace(go.Scatter(
-        x=trend_data["Month_Year"],
+    fig_dual.add_trace(trend_trace(
+        x=trend_x,
         y=trend_data["Profit"],
         name="Profit",
         mode="lines+markers",
@@ -550,8 +656,8 @@ else:
 
     # Optional: Profit Margin (Right Axis as %)
     if show_margin:
-        fig_dual.add_trace(go.Scatter(
-            x=trend_data["Month_Year"],
+        fig_dual.add_trace(trend_trace(
+            x=trend_x,
             y=trend_data["Margin %"],
             name="Margin %",
             mode="lines+markers",
@@ -560,7 +666,7 @@ else:
         ))
 
     fig_dual.update_layout(
-        xaxis=dict(title="Month-Year"),
+        xaxis=dict(title=AXIS_TITLES[trend_granularity]),
         yaxis=dict(
             title=dict(text="Sales ($)", font=dict(color="#1f77b4")),
             tickfont=dict(color="#1f77b4")
@@ -583,6 +689,7 @@ else:
     # For PDF
     trend_chart_for_pdf = fig_dual
 
+profile.start("segment_chart")
 # -------------------------------
 # Segment-wise Sales and Profit Comparison
 # -------------------------------
@@ -590,12 +697,7 @@ else:
 st.markdown("### Segment-Wise Sales & Profit Breakdown")
 
 # Aggregate by segment
-segment_perf = (
-    filtered_df.groupby("Segment")[["Sales", "Profit"]]
-    .sum()
-    .reset_index()
-    .sort_values("Sales", ascending=False)
-)
+segment_perf = results["segment_perf"]
 
 # Bar chart (grouped)
 fig_segment_bar = px.bar(
@@ -620,6 +722,7 @@ fig_segment_bar.update_layout(
 st.plotly_chart(fig_segment_bar, use_container_width=True)
 
 
+profile.start("pie_charts")
 # -------------------------------
 # Dynamic Pie Chart: Clean for Sub-Category
 # -------------------------------
@@ -631,12 +734,7 @@ pie_dim = st.radio("Group Sales By:", ["Category", "Sub-Category"], horizontal=T
 
 if pie_dim == "Category":
     # Simple pie by Category
-    pie_data = (
-        filtered_df.groupby("Category")["Sales"]
-        .sum()
-        .reset_index()
-        .sort_values("Sales", ascending=False)
-    )
+    pie_data = results["category_sales"]
 
     fig_pie = px.pie(
         pie_data,
@@ -650,21 +748,19 @@ if pie_dim == "Category":
     fig_pie.update_traces(textposition='inside', textinfo='percent+label')
     fig_pie.update_layout(template="plotly_white", height=400)
     st.plotly_chart(fig_pie, use_container_width=True)
+    pie_charts_for_pdf = [fig_pie]
 
 else:
     st.markdown("#### Sub-Category Breakdown by Each Category")
-    categories = filtered_df["Category"].unique()
+    subcat_totals = results["subcat_sales"]
+    categories = subcat_totals["Category"].unique()
     fig_subcat_list = []
     # Layout for 3 pie charts side-by-side
     col1, col2, col3 = st.columns(3)
 
     for cat, col in zip(categories, [col1, col2, col3]):
-        cat_df = filtered_df[filtered_df["Category"] == cat]
-
         subcat_sales = (
-            cat_df.groupby("Sub-Category")["Sales"]
-            .sum()
-            .reset_index()
+            subcat_totals[subcat_totals["Category"] == cat]
             .sort_values("Sales", ascending=False)
         )
 
@@ -681,26 +777,24 @@ else:
         fig_subcat.update_layout(template="plotly_white", height=400, margin=dict(t=40, b=40, l=10, r=10))
         
         col.plotly_chart(fig_subcat, use_container_width=True)
+    pie_charts_for_pdf = fig_subcat_list
 
+profile.start("downloads_and_reports")
 ## Lets add a Beautiful CSV Download Button
 # -------------------------------
-# Download Filtered Data as CSV
+# Download Filtered Data (generated lazily on click)
 # -------------------------------
 
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode('utf-8-sig')
-
 # ------------------------------------------
-# Generate and Return PDF Report to App
+# Prepare PDF Report Content
 # ------------------------------------------
-def generate_and_return_pdf():
+def prepare_report_content():
     # Prepare KPI dictionary
     kpis = {
         "Total Sales": f"${total_sales:,.0f}",
         "Total Profit": f"${total_profit:,.0f}",
         "Total Orders": f"{total_orders:,}",
-        "Unique Customers": f"{unique_customers:,}"
+        "Unique Customers": unique_customers_label
     }
 
     # Prepare Insight List
@@ -712,38 +806,66 @@ def generate_and_return_pdf():
         f"Sub-Categories in Loss: {', '.join(loss_subcats) if loss_subcats else 'None'}"
     ]
 
-    alerts = generate_alerts(filtered_df)
-    # Output path
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    output_file = f"superstore_report_{timestamp}.pdf"
-
-    # Generate PDF
-    generate_pdf_report(filtered_df, kpis, insights, output_path=output_file, alerts=alerts)
+    alerts = [alert["text"] for alert in results["alerts"]]
 
-    # Read PDF as bytes for download
-    with open(output_file, "rb") as f:
-        pdf_bytes = f.read()
-
-    return pdf_bytes
+    return kpis, insights, alerts
 
 st.sidebar.markdown("### Download Options")
 
-# CSV Download
-csv = convert_df_to_csv(filtered_df)
+# Data Download: nothing is serialized until the user clicks the button
 st.sidebar.markdown("### Download Filtered Data")
+export_format = st.sidebar.selectbox("Export Format", list(EXPORT_FORMATS.keys()))
+export_ext, export_mime = EXPORT_FORMATS[export_format]
 st.sidebar.download_button(
-    label="⬇️ Download CSV",
-    data=csv,
-    file_name="filtered_superstore_data.csv",
-    mime='text/csv'
+    label="⬇️ Download Data",
+    data=lambda rows=results["rows"], fmt=export_format: timed_export(df, rows, fmt, columns=EXPORT_COLUMNS),
+    file_name=f"filtered_superstore_data{export_ext}",
+    mime=export_mime
 )
 
-# PDF Report Generation
+# PDF Report Generation: queued as a background job, the page stays usable meanwhile
 if st.sidebar.button("Generate PDF Report"):
-    with st.spinner("Generating report..."):
-        # Store the generated PDF data in the session state
-        st.session_state['pdf_report_data'] = generate_and_return_pdf()
-        st.sidebar.success("Report is ready for download!")
+    try:
+        job_id = report_jobs.submit(
+            *prepare_report_content(),
+            charts=[trend_chart_for_pdf, fig_segment_bar, *pie_charts_for_pdf],
+        )
+        if report_jobs.status(job_id)["status"] == "done":
+            # Already rendered for this content: served from the report cache
+            st.session_state['pdf_report_data'] = report_jobs.result(job_id)
+            st.session_state['report_ready'] = True
+        else:
+            st.session_state['report_job'] = job_id
+    except QueueFullError as e:
+        st.sidebar.warning(str(e))
+
+@st.fragment(run_every=1.0)
+def report_job_status():
+    # Polls the running job once a second and hands the PDF over when it is done
+    job_id = st.session_state.get('report_job')
+    job = report_jobs.status(job_id)
+    if job["status"] == "done":
+        st.session_state['pdf_report_data'] = report_jobs.result(job_id)
+        st.session_state['report_job'] = None
+        st.session_state['report_ready'] = True
+        st.rerun()
+    elif job["status"] in ("failed", "unknown"):
+        st.error(f"Report generation failed: {job.get('error') or 'job not found'}")
+        report_jobs.discard(job_id)
+        st.session_state['report_job'] = None
+    elif job["status"] == "charts":
+        st.info(f"Rendering charts... {job['elapsed']:.0f}s")
+    elif job["status"] == "queued":
+        st.info(f"Report queued (position {job['queue_position'] + 1}) · {job['elapsed']:.0f}s")
+    else:
+        st.info(f"Generating report... {job['elapsed']:.0f}s")
+
+if st.session_state.get('report_job'):
+    with st.sidebar:
+        report_job_status()
+
+if st.session_state.pop('report_ready', False):
+    st.sidebar.success("Report is ready for download!")
 
 # PDF Download Button
 # This button will only appear AFTER a report has been generated and stored.
@@ -763,6 +885,19 @@ user_email = st.sidebar.text_input("Recipient Email")
 sender_email = st.secrets["email"]["sender"]
 sender_pass = st.secrets["email"]["password"]
 
+@st.cache_resource
+def load_email_dispatcher():
+    # One background sender per process, reusing its logged-in SMTP connection
+    return EmailDispatcher(
+        host=st.secrets["email"].get("host", "smtp.gmail.com"),
+        port=int(st.secrets["email"].get("port", 465)),
+        username=sender_email,
+        password=sender_pass,
+        use_ssl=st.secrets["email"].get("use_ssl", True),
+    )
+
+email_dispatcher = load_email_dispatcher()
+
 if st.sidebar.button("📤 Send PDF to Email"):
     # First, check if a report has been generated and is available
     if 'pdf_report_data' not in st.session_state or st.session_state['pdf_report_data'] is None:
@@ -770,30 +905,47 @@ if st.sidebar.button("📤 Send PDF to Email"):
     elif not user_email or not re.match(r"[^@]+@[^@]+\.[^@]+", user_email):
         st.sidebar.error("Please enter a valid email address.")
     else:
-        try:
-            # Use the PDF data directly from the session state
-            file_data = st.session_state['pdf_report_data']
-
-            # Compose email
-            msg = EmailMessage()
-            msg['Subject'] = 'Superstore Dashboard Report'
-            # Use the variable, not the string "sender_email"
-            msg['From'] = sender_email
-            msg['To'] = user_email
-            msg.set_content("Hello,\n\nPlease find attached the Superstore dashboard report.\n\nBest regards,\nBI Dashboard")
-
-            # Attach the in-memory PDF data
-            msg.add_attachment(file_data, maintype='application', subtype='pdf', filename="superstore_report.pdf")
-
-            # SMTP send
-            with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-                smtp.login(sender_email, sender_pass)
-                smtp.send_message(msg)
-
-            st.sidebar.success(f"Report sent to {user_email}")
-
-        except Exception as e:
-            st.sidebar.error(f"Failed to send email: {e}")
+        # Queue the email; the send happens on the dispatcher's worker thread
+        job_id = email_dispatcher.submit(
+            recipients=user_email,
+            subject='Superstore Dashboard Report',
+            body="Hello,\n\nPlease find attached the Superstore dashboard report.\n\nBest regards,\nBI Dashboard",
+            attachment=st.session_state['pdf_report_data'],
+            filename="superstore_report.pdf",
+            sender=sender_email,
+        )
+        st.session_state.setdefault('email_jobs', []).append(job_id)
+        st.sidebar.info(f"Report queued for {user_email}")
+
+# Delivery status of this session's emails (refreshes on every rerun)
+if st.session_state.get('email_jobs'):
+    st.sidebar.button("🔄 Refresh Email Status")
+    for job_id in st.session_state['email_jobs'][-5:]:
+        job = email_dispatcher.status(job_id)
+        to = ", ".join(job.get("recipients", []))
+        if job["status"] == "sent":
+            st.sidebar.success(f"Report sent to {to}")
+        elif job["status"] == "failed":
+            st.sidebar.error(f"Failed to send email to {to}: {job['error']}")
+        else:
+            st.sidebar.caption(f"Email to {to}: {job['status']} (attempt {job.get('attempts', 0)})")
+
+rerun_profile = profile.finish()
+
+# Result cache statistics and rerun profile (open the app with ?debug=1)
+if st.query_params.get("debug") == "1":
+    with st.sidebar.expander("Result Cache"):
+        st.json(result_cache.stats())
+    with st.sidebar.expander("Rerun Profile"):
+        st.caption(f"Rerun #{rerun_profile['rerun']}: {rerun_profile['total_ms']:.0f} ms")
+        st.dataframe(pd.DataFrame(rerun_profile["sections"]), hide_index=True)
+        st.download_button(
+            label="Prometheus metrics",
+            data=metrics.prometheus_text(),
+            file_name="dashboard_metrics.prom",
+            mime="text/plain",
+        )
+
 st.markdown("""
 <style>
 .footer-box {
@@ -0,0 +1,225 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from synthetic_data import write_superstore_csv
+
+# ----------------------------------------------
+# Data-Layer Benchmark Suite (synthetic Superstore data)
+# ----------------------------------------------
+# Usage (from the repo root):
+#   python Batch2/Task5/benchmark.py --sizes 100k 1M 10M --output bench.json
+#   python Batch2/Task5/benchmark.py --sizes 100k --compare bench.json
+
+DATA_DIR = "Batch2/Task5/bench_data"
+
+# Fixed sidebar selections, so every commit is timed on the same work
+SCENARIOS = {
+    "all": ({}, None, None),
+    "one_region": ({"Region": ["West"]}, None, None),
+    "region_category": ({"Region": ["EMEA", "Central"], "Category": ["Technology"]}, None, None),
+    "subcats_one_year": ({"Sub-Category": ["Chairs", "Phones"]}, "2013-01-01", "2013-12-31"),
+}
+
+STAGES = ["load_cold", "load_warm", "build_indexes", "filter", "kpis", "top_customers", "monthly", "alerts", "csv_export", "pdf"]
+
+
+def parse_size(text: str) -> int:
+    """'100k' / '1M' / '10M' / '250000' -> rows."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def _timed(func, repeat=1):
+    """Runs `func` `repeat` times; returns (median seconds, last result)."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def ensure_dataset(rows: int, seed: int, data_dir=DATA_DIR) -> str:
+    """Writes the synthetic CSV for (rows, seed) once and reuses it afterwards."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"superstore_{rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {rows:,} synthetic rows -> {path}")
+        write_superstore_csv(path, rows, seed=seed)
+    return path
+
+
+def run_size(csv_path: str, repeat: int) -> dict:
+    """
+    Times every stage on one dataset. Runs in its own process, so peak RSS
+    belongs to this dataset alone.
+    """
+    # Imported here so the parent process stays small
+    from data_store import load_superstore, load_columnar, shared_frame, DERIVED_COLUMNS
+    from cube import SalesCube, CustomerSketchCube, monthly_summary
+    from filter_engine import BitmapIndex
+    from lookup_index import LookupIndex
+    from customer_table import CustomerTable
+    from exports import build_export
+    from generate_report import generate_alerts, generate_pdf_report
+
+    arrow_path = csv_path[:-len(".csv")] + ".arrow"
+    stages = {}
+
+    def record(stage, seconds, **extra):
+        stages[stage] = {"seconds": seconds, "peak_rss_mb": peak_rss_mb(), **extra}
+
+    if os.path.exists(arrow_path):
+        os.remove(arrow_path)
+    seconds, df = _timed(lambda: load_superstore(csv_path, arrow_path))
+    record("load_cold", seconds, rows=len(df))
+    seconds, df = _timed(lambda: shared_frame(load_columnar(arrow_path)), repeat)
+    record("load_warm", seconds)
+
+    seconds, (cube, index, _, customers, sketches) = _timed(
+        lambda: (SalesCube(df), BitmapIndex(df), LookupIndex(df), CustomerTable(df), CustomerSketchCube(df))
+    )
+    record("build_indexes", seconds)
+
+    per_scenario = {}
+    for name, (selections, start, end) in SCENARIOS.items():
+        start = pd.to_datetime(start) if start else df["Order Date"].min()
+        end = pd.to_datetime(end) if end else df["Order Date"].max()
+        regions = selections.get("Region", [])
+        categories = selections.get("Category", [])
+        subcats = selections.get("Sub-Category", [])
+
+        t_filter, (rows, cells) = _timed(
+            lambda: (index.select(selections, start, end), cube.slice(regions, categories, subcats, start, end)),
+            repeat,
+        )
+        selection = df.iloc[rows]
+        t_kpis, kpis = _timed(lambda: {
+            "Total Sales": f"${cells['Sales'].sum():,.0f}",
+            "Total Profit": f"${cells['Profit'].sum():,.0f}",
+            "Total Orders": f"{int(cells['Orders'].sum()):,}",
+            "Unique Customers": f"~{sketches.count(regions, categories, subcats, start, end):,}",
+        }, repeat)
+        t_top, _ = _timed(lambda: customers.top(customers.totals(rows), 100, "Sales"), repeat)
+        t_monthly, monthly = _timed(lambda: monthly_summary(cells), repeat)
+        t_alerts, alerts = _timed(lambda: generate_alerts(cells=cells, monthly=monthly), repeat)
+        per_scenario[name] = {
+            "rows": len(selection), "filter": t_filter, "kpis": t_kpis, "top_customers": t_top,
+            "monthly": t_monthly, "alerts": t_alerts,
+            "kpis_value": kpis, "monthly_value": monthly, "alerts_value": alerts,
+        }
+
+    for stage in ("filter", "kpis", "top_customers", "monthly", "alerts"):
+        record(stage, sum(s[stage] for s in per_scenario.values()) / len(per_scenario),
+               per_scenario={name: s[stage] for name, s in per_scenario.items()})
+
+    # Export and report use the single-region selection (a typical download)
+    export_rows = index.select(SCENARIOS["one_region"][0], df["Order Date"].min(), df["Order Date"].max())
+    columns = [col for col in df.columns if col not in DERIVED_COLUMNS]
+    seconds, out = _timed(lambda: build_export(df, export_rows, "CSV", columns=columns), repeat)
+    record("csv_export", seconds, bytes=out.getbuffer().nbytes)
+
+    region = per_scenario["one_region"]
+    monthly = region["monthly_value"]
+    insights = [
+        f"Highest Sales Month: {monthly.loc[monthly['Sales'].idxmax(), 'Month_Year']}",
+        f"Lowest Profit Month: {monthly.loc[monthly['Profit'].idxmin(), 'Month_Year']}",
+    ]
+    seconds, pdf = _timed(
+        lambda: generate_pdf_report(None, region["kpis_value"], insights, alerts=region["alerts_value"]),
+        repeat,
+    )
+    record("pdf", seconds, bytes=len(pdf))
+
+    return {"rows": len(df), "stages": stages, "peak_rss_mb": peak_rss_mb()}
+
+
+def environment() -> dict:
+    """Commit and library versions, so results from different runs can be compared fairly."""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_table(results: dict, baseline: dict = None):
+    for size, result in results["sizes"].items():
+        print(f"\n{int(size):,} rows (peak RSS {result['peak_rss_mb'] or 0:,.0f} MB)")
+        old = (baseline or {}).get("sizes", {}).get(size, {}).get("stages", {})
+        for stage in STAGES:
+            seconds = result["stages"][stage]["seconds"]
+            line = f"  {stage:<14}{seconds * 1000:>12.1f} ms"
+            if stage in old:
+                line += f"   vs {old[stage]['seconds'] * 1000:>10.1f} ms  ({seconds / old[stage]['seconds']:.2f}x)"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard data layer on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", default=["100k", "1M", "10M"], help="Row counts, e.g. 100k 1M 10M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per in-memory stage (median is reported)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = {"environment": environment(), "seed": args.seed, "repeat": args.repeat, "sizes": {}}
+    for size in map(parse_size, args.sizes):
+        csv_path = ensure_dataset(size, args.seed, args.data_dir)
+        # Fresh process per size: clean peak RSS and no caches carried over
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results["sizes"][str(size)] = pool.submit(run_size, csv_path, args.repeat).result()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"\nResults saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    # Make the sibling modules importable when run from the repo root
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+from concurrent.futures import Future
+
+import plotly.io as pio
+
+from process_pool import ScriptSafePool
+
+# ----------------------------------------------
+# Parallel, Cached Chart Rasterizer (Plotly -> PNG)
+# ----------------------------------------------
+
+CHART_WIDTH = 1000
+CHART_HEIGHT = 600
+
+
+def figure_json(fig) -> str:
+    """Serialized figure, the form charts are passed around (and hashed) in."""
+    return fig if isinstance(fig, str) else pio.to_json(fig, validate=False)
+
+
+def figure_key(fig_json: str, width=CHART_WIDTH, height=CHART_HEIGHT, scale=1) -> str:
+    """Cache key of a rendered chart: the figure itself plus the output size."""
+    digest = hashlib.sha256(fig_json.encode())
+    digest.update(f"{width}x{height}@{scale}".encode())
+    return digest.hexdigest()
+
+
+def rasterize(fig_json: str, width=CHART_WIDTH, height=CHART_HEIGHT, scale=1) -> bytes:
+    """Worker entry point: renders one figure to PNG bytes with kaleido."""
+    return pio.to_image(pio.from_json(fig_json), format="png", width=width, height=height, scale=scale)
+
+
+class ChartRasterizer:
+    """
+    Renders batches of Plotly figures to PNG in worker processes.
+
+    Every figure of a batch goes to the pool at once, so a report's charts
+    render in parallel instead of one kaleido call after another. PNGs are
+    cached by figure_key(), so charts that did not change since the last
+    report are never rendered again.
+
+    Parameters:
+    - max_workers: Pool size (one figure per worker at a time)
+    - cache: Optional ResultCache for rendered PNGs
+    - width / height / scale: Output size, as in save_chart_image()
+    """
+
+    def __init__(self, max_workers=3, cache=None, width=CHART_WIDTH, height=CHART_HEIGHT, scale=1):
+        self.cache = cache
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self._pool = ScriptSafePool(max_workers=max_workers)
+
+    def key(self, fig) -> str:
+        return figure_key(figure_json(fig), self.width, self.height, self.scale)
+
+    def submit(self, figures) -> Future:
+        """
+        Starts rendering a batch and returns a Future of the PNG bytes, in
+        the order of `figures`. A chart that fails to render (e.g. kaleido
+        or its browser is missing) comes back as None.
+        """
+        figures = [figure_json(fig) for fig in figures]
+        images = [None] * len(figures)
+        batch = Future()
+        remaining = [len(figures)]
+        lock = threading.Lock()
+
+        def done(i, key, future):
+            try:
+                images[i] = future.result()
+            except Exception:
+                images[i] = None
+            if images[i] is not None and self.cache is not None:
+                self.cache.put(key, images[i])
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    batch.set_result(images)
+
+        for i, fig_json in enumerate(figures):
+            key = figure_key(fig_json, self.width, self.height, self.scale)
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+            else:
+                future = self._pool.submit(rasterize, fig_json, self.width, self.height, self.scale)
+            future.add_done_callback(lambda future, i=i, key=key: done(i, key, future))
+
+        if not figures:
+            batch.set_result(images)
+        return batch
+
+    def render(self, figures) -> list:
+        """Blocking version of submit()."""
+        return self.submit(figures).result()
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+from filter_engine import date_bounds
+from data_store import MONTH_COLUMN
+from periods import key_labels, month_key, period_keys
+import hll
+
+# ----------------------------------------------
+# Pre-aggregated Sales Cube for Dashboard KPIs
+# ----------------------------------------------
+
+DIMENSIONS = ["Region", "Category", "Sub-Category", "Segment", "Month"]
+MEASURES = ["Sales", "Profit", "Orders"]
+SKETCH_DIMENSIONS = ["Region", "Category", "Sub-Category", "Month"]
+
+
+def _aggregate(df: pd.DataFrame, months: pd.Series) -> pd.DataFrame:
+    """Sums Sales/Profit and counts rows at the cube grain."""
+    keys = [df[dim] for dim in DIMENSIONS[:-1]] + [months.rename("Month")]
+    cells = (
+        df.assign(Orders=1)
+        .groupby(keys, observed=True)[MEASURES]
+        .sum()
+        .reset_index()
+    )
+    return cells
+
+
+class SalesCube:
+    """
+    Sums and counts at the Region x Category x Sub-Category x Segment x Month
+    grain, built once when the data loads.
+
+    The date filter works on whole days, so the first and last month of a
+    range can be partially selected. Those two edge months are re-aggregated
+    from their rows, found by binary search on the date-sorted frame; every
+    month in between is read straight from the cube.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.dates = df["Order Date"].to_numpy()
+        self.cells = _aggregate(df, _months(df))
+
+    def slice(self, regions=None, categories=None, subcats=None, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Returns the cube cells for the current sidebar selection.
+
+        Empty selections mean "all", same as the sidebar multiselects.
+        """
+        start = pd.to_datetime(start_date) if start_date is not None else self.df["Order Date"].min()
+        end = pd.to_datetime(end_date) if end_date is not None else self.df["Order Date"].max()
+        first_month, last_month = start.to_period("M"), end.to_period("M")
+
+        cells = self.cells
+        mask = (cells["Month"] > month_key(first_month)) & (cells["Month"] < month_key(last_month))
+        mask &= _dimension_mask(cells, regions, categories, subcats)
+        interior = cells[mask]
+
+        # Edge months: aggregate only the rows that fall inside [start, end]
+        windows = [(start, min(end, first_month.end_time))]
+        if last_month != first_month:
+            windows.append((last_month.start_time, end))
+        parts = []
+        for window_start, window_end in windows:
+            lo, hi = date_bounds(self.dates, window_start, window_end)
+            rows = self.df.iloc[lo:hi]
+            rows = rows[_dimension_mask(rows, regions, categories, subcats)]
+            if len(rows):
+                parts.append(_aggregate(rows, _months(rows)))
+
+        return pd.concat([interior] + parts, ignore_index=True)
+
+
+class CustomerSketchCube:
+    """
+    HyperLogLog sketches of Customer ID per Region x Category x Sub-Category
+    x Month cell (the sidebar's filter grain; Segment is not a filter, so
+    it is left out to keep the sketch count down).
+
+    A selection's distinct-customer estimate is the element-wise max of
+    the selected cells' registers, i.e. O(cells) instead of hashing every
+    selected row. As in SalesCube, the two edge months of a date range are
+    sketched from their rows. See hll.py for the error bound.
+
+    Parameters:
+    - df: Date-sorted frame (the shared dataset)
+    - precision: Register bits per sketch (2**precision registers each)
+    - column: Column whose distinct values are counted
+    """
+
+    def __init__(self, df: pd.DataFrame, precision=hll.DEFAULT_PRECISION, column="Customer ID"):
+        self.df = df
+        self.precision = precision
+        self.dates = df["Order Date"].to_numpy()
+        self.hashes = hll.hash_values(df[column])
+
+        grouped = df.groupby([df[dim] for dim in SKETCH_DIMENSIONS[:-1]] + [_months(df).rename("Month")],
+                             observed=True)
+        self.cells = grouped.size().reset_index()[SKETCH_DIMENSIONS]
+        cell_of_row = grouped.ngroup().to_numpy()
+
+        m = 1 << precision
+        index, rank = hll.register_updates(self.hashes, precision)
+        registers = np.zeros(len(self.cells) * m, dtype=np.uint8)
+        np.maximum.at(registers, cell_of_row[self.hashes != 0] * m + index, rank)
+        self.registers = registers.reshape(len(self.cells), m)
+
+        # Year roll-ups: whole years inside a range merge one sketch per series
+        # instead of twelve. Cells are sorted by series then month, so each
+        # (series, year) block is contiguous.
+        self.cell_years = self.cells["Month"].to_numpy() // 12
+        year_keys = self.cells[SKETCH_DIMENSIONS[:-1]].assign(Year=self.cell_years)
+        starts = np.flatnonzero(year_keys.ne(year_keys.shift()).any(axis=1).to_numpy())
+        self.year_cells = year_keys.iloc[starts].reset_index(drop=True)
+        self.year_registers = np.maximum.reduceat(self.registers, starts, axis=0)
+
+    def count(self, regions=None, categories=None, subcats=None, start_date=None, end_date=None) -> int:
+        """Estimated distinct customers for the sidebar selection (same arguments as SalesCube.slice)."""
+        start = pd.to_datetime(start_date) if start_date is not None else self.df["Order Date"].min()
+        end = pd.to_datetime(end_date) if end_date is not None else self.df["Order Date"].max()
+        first_month, last_month = start.to_period("M"), end.to_period("M")
+
+        # An edge month counts as whole when the range drops none of its rows;
+        # only partial edge months are sketched from their rows
+        lo, hi = date_bounds(self.dates, start, end)
+        first_whole = lo == date_bounds(self.dates, first_month.start_time, end)[0]
+        last_whole = hi == date_bounds(self.dates, start, last_month.end_time)[1]
+        if first_month == last_month:
+            first_whole = last_whole = first_whole and last_whole
+        windows = []
+        if not first_whole:
+            windows.append((start, min(end, first_month.end_time)))
+        if not last_whole and last_month != first_month:
+            windows.append((last_month.start_time, end))
+        first_key = month_key(first_month) + (not first_whole)
+        last_key = month_key(last_month) - (not last_whole)
+
+        # Whole months: whole years from the roll-ups, the rest month by month
+        full_years = np.arange(first_key // 12 + (first_key % 12 != 0), last_key // 12 + (last_key % 12 == 11))
+        cells = self.cells
+        mask = (cells["Month"] >= first_key) & (cells["Month"] <= last_key)
+        mask &= ~np.isin(self.cell_years, full_years)
+        mask &= _dimension_mask(cells, regions, categories, subcats)
+        year_mask = self.year_cells["Year"].isin(full_years)
+        year_mask &= _dimension_mask(self.year_cells, regions, categories, subcats)
+        merged = np.maximum(
+            self.registers[mask.to_numpy()].max(axis=0, initial=0),
+            self.year_registers[year_mask.to_numpy()].max(axis=0, initial=0),
+        )
+
+        for window_start, window_end in windows:
+            lo, hi = date_bounds(self.dates, window_start, window_end)
+            rows = self.df.iloc[lo:hi]
+            selected = _dimension_mask(rows, regions, categories, subcats).to_numpy()
+            np.maximum(merged, hll.sketch(self.hashes[lo:hi][selected], self.precision), out=merged)
+
+        return int(round(hll.estimate(merged)))
+
+    def relative_error(self) -> float:
+        return hll.relative_error(self.precision)
+
+
+def _months(frame: pd.DataFrame) -> pd.Series:
+    """Month key of each row, from the shared key column when the frame has it."""
+    if MONTH_COLUMN in frame.columns:
+        return frame[MONTH_COLUMN]
+    return pd.Series(period_keys(frame["Order Date"], "Month"), index=frame.index)
+
+
+def _dimension_mask(frame: pd.DataFrame, regions, categories, subcats) -> pd.Series:
+    mask = pd.Series(True, index=frame.index)
+    if regions:
+        mask &= frame["Region"].isin(regions)
+    if categories:
+        mask &= frame["Category"].isin(categories)
+    if subcats:
+        mask &= frame["Sub-Category"].isin(subcats)
+    return mask
+
+
+def rollup(cells: pd.DataFrame, by, measures=("Sales", "Profit")) -> pd.DataFrame:
+    """
+    Rolls sliced cube cells up to the given dimension(s).
+
+    Parameters:
+    - cells: Output of SalesCube.slice()
+    - by: Dimension name or list of names (e.g. "Segment", ["Month"])
+    - measures: Measures to sum
+    """
+    return (
+        cells.groupby(by, observed=True)[list(measures)]
+        .sum()
+        .reset_index()
+    )
+
+
+def monthly_summary(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per month with Sales, Profit and Margin %, sorted by month.
+
+    Built once per filter state and shared by the insights panel, the
+    alerts, the trend chart and the PDF alerts. `frame` is either sliced
+    cube cells or any frame with an int month key "Month" column; the
+    "Month_Year" label is formatted only for the summary rows.
+    """
+    monthly = rollup(frame, "Month").sort_values("Month").reset_index(drop=True)
+    monthly.insert(1, "Month_Year", key_labels(monthly["Month"], "Month"))
+    monthly["Margin %"] = (monthly["Profit"] / monthly["Sales"]) * 100
+    return monthly
+
+
+def period_summary(keys, sales, profit, granularity="Month") -> pd.DataFrame:
+    """
+    One row per period with Sales, Profit and Margin %, sorted by key.
+
+    Groups with np.unique / np.bincount on int period keys, so Day and
+    Week trends over the selected rows need no pandas groupby; the
+    "Period" label is formatted last, only for the rows that remain.
+
+    Parameters:
+    - keys: int period keys (periods.py), one per row or cube cell
+    - sales / profit: Values aligned with `keys`
+    - granularity: Granularity of `keys`, used for the labels
+    """
+    unique, inverse = np.unique(np.asarray(keys), return_inverse=True)
+    summary = pd.DataFrame({
+        "Key": unique,
+        "Period": key_labels(unique, granularity),
+        "Sales": np.bincount(inverse, weights=np.asarray(sales, dtype=np.float64), minlength=len(unique)),
+        "Profit": np.bincount(inverse, weights=np.asarray(profit, dtype=np.float64), minlength=len(unique)),
+    })
+    summary["Margin %"] = (summary["Profit"] / summary["Sales"]) * 100
+    return summary
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# Customer-Level Aggregates & Top-N Leaderboards
+# ----------------------------------------------
+
+RANK_MEASURES = ["Sales", "Profit", "Orders"]
+
+
+class CustomerTable:
+    """
+    Per-customer Sales / Profit / Orders, built once at load time.
+
+    Every row's customer code is kept next to its Sales and Profit, so the
+    totals for any filtered row set are one np.bincount per measure (no
+    groupby). Totals over the whole dataset are precomputed and reused
+    when the filter covers every row.
+    """
+
+    def __init__(self, df: pd.DataFrame, column="Customer Name"):
+        values = df[column].astype("category")
+        self.column = column
+        self.names = np.asarray(values.cat.categories, dtype=object)
+        self.codes = values.cat.codes.to_numpy()
+        self.measures = {
+            "Sales": df["Sales"].to_numpy(dtype=np.float64),
+            "Profit": df["Profit"].to_numpy(dtype=np.float64),
+        }
+        self.n_rows = len(df)
+        self.all_totals = self._bincount(slice(0, self.n_rows))
+
+    def _bincount(self, rows) -> dict:
+        codes = self.codes[rows]
+        weights = {name: values[rows] for name, values in self.measures.items()}
+        # Rows without a customer name (code -1) are left out, as groupby does
+        if (codes < 0).any():
+            named = codes >= 0
+            codes = codes[named]
+            weights = {name: values[named] for name, values in weights.items()}
+
+        size = len(self.names)
+        totals = {
+            name: np.bincount(codes, weights=values, minlength=size)
+            for name, values in weights.items()
+        }
+        totals["Orders"] = np.bincount(codes, minlength=size)
+        return totals
+
+    def totals(self, rows) -> dict:
+        """
+        Per-customer totals for the given rows, as {measure: array indexed by code}.
+
+        Parameters:
+        - rows: Active filter as a slice or row positions (BitmapIndex.select output)
+        """
+        if isinstance(rows, slice) and rows.indices(self.n_rows)[:2] == (0, self.n_rows):
+            return self.all_totals
+        return self._bincount(rows)
+
+    def top(self, totals: dict, n=5, by="Sales") -> pd.DataFrame:
+        """
+        The `n` customers with the highest `by`, largest first.
+
+        Uses np.argpartition to pick the top `n` in linear time and sorts
+        only those, so a top-100 leaderboard never sorts every customer.
+        Customers without rows in the selection are left out.
+
+        Parameters:
+        - totals: Output of totals()
+        - n: Number of customers to return
+        - by: Ranking measure, one of RANK_MEASURES
+        """
+        present = np.flatnonzero(totals["Orders"])
+        scores = totals[by][present]
+        if n < len(present):
+            # argpartition on the negated scores puts the n largest first
+            pick = np.argpartition(-scores, n - 1)[:n]
+        else:
+            pick = np.arange(len(present))
+        # Highest first; ties keep a fixed customer order so reruns are stable
+        pick = pick[np.lexsort((present[pick], -scores[pick]))]
+        codes = present[pick]
+
+        table = pd.DataFrame({self.column: self.names[codes]})
+        for name in RANK_MEASURES:
+            table[name] = totals[name][codes]
+        return table
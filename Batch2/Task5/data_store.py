@@ -0,0 +1,169 @@
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from periods import GRANULARITIES, period_keys
+
+# ----------------------------------------------
+# Columnar Storage for the Superstore Dataset
+# ----------------------------------------------
+
+CSV_PATH = "Batch2/Task5/cleaned_global_superstore.csv"
+ARROW_PATH = "Batch2/Task5/cleaned_global_superstore.arrow"
+
+DATE_COLUMN = "Order Date"
+
+# Derived once per process in shared_frame(), never per session:
+# int32 period keys of the order date (see periods.py)
+PERIOD_KEY_COLUMNS = {granularity: f"Order {granularity} Key" for granularity in GRANULARITIES}
+MONTH_COLUMN = PERIOD_KEY_COLUMNS["Month"]
+DERIVED_COLUMNS = list(PERIOD_KEY_COLUMNS.values())
+
+# Bumped whenever the on-disk layout changes so older Arrow files get rebuilt
+FORMAT_VERSION = "3"
+
+
+def _dictionary_encode(column):
+    """
+    Dictionary-encodes a text column with its values in sorted order, so
+    groupbys on the resulting categoricals keep the alphabetical group
+    order the dashboard had with plain strings.
+    """
+    values = pc.unique(column).drop_null()
+    values = values.take(pc.array_sort_indices(values))
+    indices = pc.index_in(column, value_set=values)
+    return pa.chunked_array(
+        [pa.DictionaryArray.from_arrays(chunk, values) for chunk in indices.chunks],
+        type=pa.dictionary(pa.int32(), values.type),
+    )
+
+
+def convert_csv_to_arrow(csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """
+    One-time conversion of the cleaned CSV into an Arrow IPC file.
+
+    - Column names are stripped of stray whitespace
+    - "Order Date" is stored as a native timestamp column
+    - Every text column (Region, Category, Sub-Category, Segment,
+      Customer Name, ...) is dictionary-encoded
+    - Rows are sorted by "Order Date" (unparseable dates last), so date
+      ranges map to contiguous row slices
+
+    The file is written uncompressed so it can be memory-mapped as-is. It is
+    written to a temporary file next to `arrow_path` and renamed into place,
+    so another process (or a concurrent first load) never maps a partial file.
+    """
+    table = pacsv.read_csv(csv_path)
+    table = table.rename_columns([name.strip() for name in table.column_names])
+
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if name == DATE_COLUMN:
+            # Same parsing rules as the old load_data(): unparseable dates become NaT
+            dates = pd.to_datetime(column.to_pandas(), dayfirst=False, errors="coerce")
+            column = pa.array(dates, type=pa.timestamp("ns"))
+        elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = _dictionary_encode(column)
+        columns.append(column)
+
+    table = pa.table(columns, names=table.column_names)
+    table = table.sort_by([(DATE_COLUMN, "ascending")])
+    table = table.replace_schema_metadata({"format_version": FORMAT_VERSION})
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".arrow.tmp", dir=os.path.dirname(os.path.abspath(arrow_path)))
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, arrow_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return arrow_path
+
+
+def arrow_is_stale(csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """True when the Arrow file is missing, from an older layout or older than the source CSV."""
+    if not os.path.exists(arrow_path):
+        return True
+    metadata = pa.ipc.open_file(pa.memory_map(arrow_path, "r")).schema.metadata or {}
+    if metadata.get(b"format_version") != FORMAT_VERSION.encode():
+        return True
+    if not os.path.exists(csv_path):
+        return False
+    return os.path.getmtime(arrow_path) < os.path.getmtime(csv_path)
+
+
+def load_columnar(arrow_path=ARROW_PATH):
+    """
+    Memory-maps the Arrow file and returns it as a DataFrame.
+
+    Dictionary-encoded columns come back as pandas categoricals and the
+    numeric / timestamp buffers are read straight from the mapped file.
+    """
+    source = pa.memory_map(arrow_path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    """Marks an array and every array it is a view of as read-only (no copy)."""
+    array = values
+    while isinstance(array, np.ndarray):
+        array.flags.writeable = False
+        array = array.base
+    return values
+
+
+def shared_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the dataset as an immutable frame meant to be shared by every
+    session of the process (see st.cache_resource in app.py).
+
+    - Adds the int32 Day / Week / Month / Quarter key columns once,
+      instead of each consumer calling dt.to_period() on its own copy
+    - Makes every column buffer read-only: memory-mapped columns already
+      are, categorical codes and derived columns are frozen here. An
+      in-place write (df.loc[...] = x) then raises instead of silently
+      changing the data other sessions see.
+
+    Sessions work with row positions (slices / index arrays) into this
+    frame and read single columns at those positions; rows are only copied
+    out for an active customer/product lookup, and then only the matching
+    rows of the columns shown. An idle rerun copies no rows at all.
+    """
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = _read_only(column.cat.codes.to_numpy().copy())
+            columns[name] = pd.Categorical.from_codes(codes, dtype=column.dtype, validate=False)
+        else:
+            _read_only(column.to_numpy())
+            columns[name] = column
+    for granularity, name in PERIOD_KEY_COLUMNS.items():
+        columns[name] = _read_only(period_keys(df[DATE_COLUMN], granularity))
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_superstore(csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """
+    Loads the dataset as a read-only shared frame, converting the CSV
+    first if the Arrow file is out of date.
+    """
+    if arrow_is_stale(csv_path, arrow_path):
+        convert_csv_to_arrow(csv_path, arrow_path)
+    return shared_frame(load_columnar(arrow_path))
+
+
+if __name__ == "__main__":
+    # Usage: python Batch2/Task5/data_store.py [csv_path] [arrow_path]
+    src = sys.argv[1] if len(sys.argv) > 1 else CSV_PATH
+    dst = sys.argv[2] if len(sys.argv) > 2 else ARROW_PATH
+    convert_csv_to_arrow(src, dst)
+    print(f"Arrow file saved as: {dst}")
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ----------------------------------------------
+# Server-Side Downsampling for Trend Charts
+# ----------------------------------------------
+
+# Assumed plot width when the browser's real width is unknown (use_container_width)
+DEFAULT_WIDTH_PX = 1400
+
+# Above this many points per trace, switch to WebGL rendering
+SCATTERGL_THRESHOLD = 1000
+
+
+def lttb(y, n_out, x=None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of `n_out` points that keep
+    the visual shape of the series. First and last points are always kept.
+
+    Parameters:
+    - y: Values
+    - n_out: Number of points to keep
+    - x: Optional x positions (default: evenly spaced)
+    """
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # n_out - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[hi:edges[i + 2]].mean()
+            next_y = y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        # Twice the triangle area between the last kept point, each candidate and the next bucket's mean
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_buckets(y, n_out) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of each of `n_out // 2` buckets,
+    so every spike and every dip (e.g. a loss month) survives.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    buckets = n_out // 2
+    if buckets < 1 or n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.intp)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        part = np.nan_to_num(y[lo:hi])
+        keep.extend((lo + int(np.argmin(part)), lo + int(np.argmax(part))))
+    return np.unique(keep)
+
+
+def downsample_frame(frame: pd.DataFrame, shape_columns, extrema_columns=(), width_px=DEFAULT_WIDTH_PX,
+                     points_per_px=1.0) -> pd.DataFrame:
+    """
+    Reduces a time-ordered frame to roughly one row per pixel of chart width.
+
+    All traces share the kept rows, so hover and axes stay aligned. Rows
+    are the union of LTTB picks for `shape_columns`, per-bucket min/max for
+    `extrema_columns`, and the overall min and max of every column. Frames
+    that already fit are returned unchanged.
+
+    Parameters:
+    - frame: Rows in x order
+    - shape_columns: Columns downsampled with LTTB (e.g. Sales)
+    - extrema_columns: Columns whose peaks and dips must all stay visible (e.g. Profit)
+    - width_px: Plot width in pixels
+    - points_per_px: Point budget per pixel
+    """
+    max_points = max(int(width_px * points_per_px), 3)
+    if len(frame) <= max_points:
+        return frame
+
+    columns = list(shape_columns) + list(extrema_columns)
+    share = max(max_points // max(len(columns), 1), 3)
+    keep = [lttb(frame[col].to_numpy(), share) for col in shape_columns]
+    keep += [minmax_buckets(frame[col].to_numpy(), share) for col in extrema_columns]
+    for col in columns:
+        values = np.nan_to_num(frame[col].to_numpy(dtype=float))
+        keep.append(np.array([np.argmin(values), np.argmax(values)]))
+    return frame.iloc[np.unique(np.concatenate(keep))]
+
+
+def scatter_trace(n_points, threshold=SCATTERGL_THRESHOLD):
+    """go.Scatter for small series, go.Scattergl (WebGL) past `threshold` points."""
+    return go.Scattergl if n_points > threshold else go.Scatter
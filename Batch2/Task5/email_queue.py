@@ -0,0 +1,226 @@
+import hashlib
+import itertools
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+# ----------------------------------------------
+# Background Email Dispatch (pooled SMTP connection)
+# ----------------------------------------------
+
+QUEUED, SENDING, SENT, FAILED = "queued", "sending", "sent", "failed"
+
+
+class EmailDispatcher:
+    """
+    Sends emails from a background worker thread so the Streamlit script
+    never waits on the SMTP relay.
+
+    - One authenticated SMTP connection is kept open and reused between
+      messages (checked with NOOP, closed after `idle_timeout` seconds)
+    - Failed sends are retried with exponential backoff
+    - Jobs with identical content that are queued together are delivered
+      in a single SMTP transaction to all of their recipients
+    - submit() returns a job id; status(job_id) can be polled from the UI.
+      Finished jobs are forgotten after `finished_ttl` seconds, and at most
+      `max_finished` of them are kept (status then reports "unknown")
+
+    For local testing point it at a plain SMTP stand-in, e.g.
+    `python -m aiosmtpd -n -l localhost:8025` with
+    EmailDispatcher("localhost", 8025, use_ssl=False).
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_ssl=True,
+                 max_retries=3, backoff=1.0, batch_window=0.2, idle_timeout=60.0, timeout=30.0,
+                 finished_ttl=3600.0, max_finished=1000):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_window = batch_window
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._smtp = None
+        self._last_used = 0.0
+        self._worker = threading.Thread(target=self._run, name="email-dispatcher", daemon=True)
+        self._worker.start()
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+
+    def submit(self, recipients, subject, body, attachment=None, filename="attachment.pdf",
+               sender=None) -> str:
+        """Queues an email and returns its job id immediately."""
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        job_id = f"mail-{next(self._ids)}"
+        job = {
+            "id": job_id,
+            "recipients": list(recipients),
+            "sender": sender or self.username,
+            "subject": subject,
+            "body": body,
+            "attachment": attachment,
+            "filename": filename,
+        }
+        job["content_key"] = _content_key(job)
+        with self._lock:
+            self._jobs[job_id] = {"status": QUEUED, "attempts": 0, "error": None,
+                                  "recipients": job["recipients"], "updated": time.time()}
+        self._queue.put(job)
+        return job_id
+
+    def status(self, job_id) -> dict:
+        """Current delivery status of a job (a copy, safe to display)."""
+        with self._lock:
+            return dict(self._jobs.get(job_id, {"status": "unknown"}))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # ------------------------------
+    # Worker
+    # ------------------------------
+
+    def _set(self, jobs, **fields):
+        with self._lock:
+            for job in jobs:
+                self._jobs[job["id"]].update(fields, updated=time.time())
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._close_if_idle()
+                self._prune()
+                continue
+
+            # Collect whatever else arrives within the batch window
+            jobs = [first]
+            deadline = time.time() + self.batch_window
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    jobs.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            batches = {}
+            for job in jobs:
+                batches.setdefault(job["content_key"], []).append(job)
+            for batch in batches.values():
+                try:
+                    self._deliver(batch)
+                except Exception as e:
+                    # Never let one batch stop the only worker thread
+                    self._set(batch, status=FAILED, error=str(e))
+            self._prune()
+
+    def _deliver(self, batch):
+        try:
+            message = _build_message(batch)
+        except Exception as e:
+            # A bad header or attachment fails the same way on every retry
+            self._set(batch, status=FAILED, error=f"Could not build message: {e}")
+            return
+        recipients = [r for job in batch for r in job["recipients"]]
+
+        for attempt in range(1, self.max_retries + 1):
+            self._set(batch, status=SENDING, attempts=attempt)
+            try:
+                smtp = self._connection()
+                smtp.send_message(message, from_addr=batch[0]["sender"], to_addrs=recipients)
+                self._last_used = time.time()
+                self._set(batch, status=SENT, error=None)
+                return
+            except Exception as e:
+                self._drop_connection()
+                self._set(batch, error=str(e))
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+        self._set(batch, status=FAILED)
+
+    def _prune(self):
+        """Forgets finished jobs older than `finished_ttl`, keeping at most `max_finished`."""
+        cutoff = time.time() - self.finished_ttl
+        with self._lock:
+            finished = sorted(
+                (record["updated"], job_id) for job_id, record in self._jobs.items()
+                if record["status"] in (SENT, FAILED)
+            )
+            excess = len(finished) - self.max_finished
+            for i, (updated, job_id) in enumerate(finished):
+                if i < excess or updated < cutoff:
+                    del self._jobs[job_id]
+
+    def _connection(self):
+        """Returns the pooled, logged-in connection, reconnecting if it went stale."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except OSError:  # includes SMTPException
+                pass
+            self._drop_connection()
+
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+        return smtp
+
+    def _drop_connection(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _close_if_idle(self):
+        if self._smtp is not None and time.time() - self._last_used > self.idle_timeout:
+            self._drop_connection()
+
+
+def _content_key(job) -> str:
+    digest = hashlib.sha256()
+    for part in (job["sender"], job["subject"], job["body"], job["filename"]):
+        digest.update(str(part).encode())
+    digest.update(job["attachment"] or b"")
+    return digest.hexdigest()
+
+
+def _build_message(batch) -> EmailMessage:
+    job = batch[0]
+    msg = EmailMessage()
+    msg["Subject"] = job["subject"]
+    msg["From"] = job["sender"]
+    if len(batch) == 1:
+        msg["To"] = ", ".join(job["recipients"])
+    else:
+        # Several requesters share one send: deliver via the envelope only,
+        # so recipients don't see each other's addresses
+        msg["To"] = "undisclosed-recipients:;"
+    msg.set_content(job["body"])
+    if job["attachment"] is not None:
+        msg.add_attachment(job["attachment"], maintype="application", subtype="pdf", filename=job["filename"])
+    return msg
@@ -0,0 +1,112 @@
+import codecs
+import io
+import zlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ----------------------------------------------
+# Lazy, Chunked Data Exports (CSV / CSV.gz / Parquet)
+# ----------------------------------------------
+
+# label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+CHUNK_ROWS = 100_000
+
+
+def _row_chunks(rows, chunk_rows):
+    """Splits a slice or array of row positions into consecutive pieces."""
+    if isinstance(rows, slice):
+        for start in range(rows.start or 0, rows.stop, chunk_rows):
+            yield slice(start, min(start + chunk_rows, rows.stop))
+    else:
+        rows = np.asarray(rows)
+        for start in range(0, len(rows), chunk_rows):
+            yield rows[start:start + chunk_rows]
+
+
+def iter_csv_chunks(df: pd.DataFrame, rows, columns=None, chunk_rows=CHUNK_ROWS):
+    """
+    Yields the selected rows as UTF-8 CSV bytes, one chunk at a time.
+
+    The output matches df.iloc[rows].to_csv(index=False).encode("utf-8-sig"),
+    including the byte-order mark Excel needs, without building the whole
+    frame or string in memory.
+    """
+    yield codecs.BOM_UTF8
+    header = True
+    for piece in _row_chunks(rows, chunk_rows):
+        chunk = df.iloc[piece]
+        if columns is not None:
+            chunk = chunk[columns]
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+    if header:
+        # No rows selected: still emit the header line
+        frame = df.iloc[0:0] if columns is None else df.iloc[0:0][columns]
+        yield frame.to_csv(index=False).encode("utf-8")
+
+
+def gzip_chunks(chunks, level=6):
+    """Streams any byte chunks through gzip compression."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def write_parquet(df: pd.DataFrame, rows, sink, columns=None, chunk_rows=CHUNK_ROWS):
+    """Writes the selected rows to `sink` as Parquet, one row group per chunk."""
+    writer = None
+    for piece in _row_chunks(rows, chunk_rows):
+        chunk = df.iloc[piece]
+        if columns is not None:
+            chunk = chunk[columns]
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+    if writer is None:
+        frame = df.iloc[0:0] if columns is None else df.iloc[0:0][columns]
+        writer = pq.ParquetWriter(sink, pa.Table.from_pandas(frame, preserve_index=False).schema)
+    writer.close()
+
+
+def build_export(df: pd.DataFrame, rows, fmt="CSV", columns=None, chunk_rows=CHUNK_ROWS):
+    """
+    Builds an export file for the given rows and returns it as a BytesIO
+    positioned at the start (a type st.download_button accepts).
+
+    Only one chunk of rows is materialised at a time, so peak memory is
+    the output file plus one chunk rather than a copy of the selection
+    plus its full CSV string.
+
+    Parameters:
+    - df: Full dataset
+    - rows: Selected rows (slice or row positions)
+    - fmt: One of EXPORT_FORMATS
+    - columns: Optional column subset
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    out = io.BytesIO()
+    if fmt == "Parquet":
+        write_parquet(df, rows, out, columns=columns, chunk_rows=chunk_rows)
+    else:
+        chunks = iter_csv_chunks(df, rows, columns=columns, chunk_rows=chunk_rows)
+        if fmt == "CSV (gzip)":
+            chunks = gzip_chunks(chunks)
+        for chunk in chunks:
+            out.write(chunk)
+    out.seek(0)
+    return out
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# Bitmap Index for the Sidebar Filters
+# ----------------------------------------------
+
+FILTER_COLUMNS = ["Region", "Category", "Sub-Category"]
+
+
+def date_bounds(dates: np.ndarray, start_date=None, end_date=None):
+    """
+    Binary-searches a sorted datetime64 array for the inclusive
+    [start_date, end_date] range and returns (lo, hi) row positions.
+    """
+    lo = 0 if start_date is None else np.searchsorted(dates, pd.to_datetime(start_date).to_datetime64(), side="left")
+    hi = len(dates) if end_date is None else np.searchsorted(dates, pd.to_datetime(end_date).to_datetime64(), side="right")
+    return int(lo), int(max(lo, hi))
+
+
+class BitmapIndex:
+    """
+    One packed bitmap (1 bit per row) for every value of each filter column.
+
+    Rows must be sorted by "Order Date" (data_store writes them that way),
+    so the date range is resolved first with a binary search. The bitmaps of
+    the chosen values are then ORed inside a column and ANDed across columns,
+    but only over the bytes covering that date slice.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns=FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self.dates = df["Order Date"].to_numpy()
+        valid = self.dates[~np.isnat(self.dates)]
+        if np.isnat(self.dates[:len(valid)]).any() or (valid[1:] < valid[:-1]).any():
+            raise ValueError("BitmapIndex expects rows sorted by 'Order Date'.")
+
+        self.bitmaps = {}
+        for col in columns:
+            values = df[col].astype("category")
+            codes = values.cat.codes.to_numpy()
+            self.bitmaps[col] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(values.cat.categories)
+            }
+
+    def _column_bits(self, col, selected, b0, b1):
+        """OR of the selected values' bitmaps for one column, bytes b0:b1 only."""
+        bits = np.zeros(b1 - b0, dtype=np.uint8)
+        for value in selected:
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is not None:
+                np.bitwise_or(bits, bitmap[b0:b1], out=bits)
+        return bits
+
+    def select(self, selections: dict, start_date=None, end_date=None):
+        """
+        Returns the rows matching the sidebar selection.
+
+        Parameters:
+        - selections: {column: selected values}; empty selections mean "all"
+        - start_date / end_date: Inclusive Order Date bounds (optional)
+
+        When no categorical filter is active the result is a slice over the
+        date range (df.iloc[slice] is a view); otherwise it is an array of
+        row positions.
+        """
+        lo, hi = date_bounds(self.dates, start_date, end_date)
+
+        active = [(col, selected) for col, selected in selections.items() if selected]
+        if not active:
+            return slice(lo, hi)
+
+        # Work on whole bytes around [lo, hi) and trim the bit offset afterwards
+        b0, b1 = lo // 8, (hi + 7) // 8
+        bits = None
+        for col, selected in active:
+            col_bits = self._column_bits(col, selected, b0, b1)
+            bits = col_bits if bits is None else np.bitwise_and(bits, col_bits, out=bits)
+
+        offset = lo - b0 * 8
+        mask = np.unpackbits(bits)[offset:offset + (hi - lo)]
+        return lo + np.flatnonzero(mask)
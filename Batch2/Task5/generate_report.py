@@ -1,9 +1,15 @@
 from fpdf import FPDF
 import plotly.io as pio
 import os
+import tempfile
+import hashlib
+import json
 import pandas as pd
 from datetime import datetime
 import pytz
+from alert_engine import business_alerts
+from data_store import MONTH_COLUMN
+from periods import period_keys
 
 # ----------------------------------------------
 # PDF Report Generator for Superstore Dashboard
@@ -56,26 +62,59 @@ class PDFReport(FPDF):
             self.multi_cell(0, 8, f"- {item}")
         self.ln(5)
 
-    def add_image(self, image_path, w=180):
-        if os.path.exists(image_path):
-            self.image(image_path, w=w)
+    def add_image(self, image, w=180):
+        # Accepts a file path or PNG bytes (e.g. from chart_render.ChartRasterizer)
+        if isinstance(image, (bytes, bytearray)):
+            # fpdf 1.7 only reads images from disk
+            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+                tmp.write(image)
+            try:
+                self.image(tmp.name, w=w)
+            finally:
+                os.remove(tmp.name)
             self.ln(10)
+        elif os.path.exists(image):
+            self.image(image, w=w)
+            self.ln(10)
+
+    def to_bytes(self) -> bytes:
+        """Renders the document into memory instead of a file."""
+        # fpdf 1.7 returns a latin-1 str for dest="S", fpdf2 returns a bytearray
+        out = self.output(dest="S")
+        return out.encode("latin-1") if isinstance(out, str) else bytes(out)
 
 # ----------------------------------------------
 # Main Function to Generate PDF Report
 # ----------------------------------------------
 
-def generate_pdf_report(df, kpis: dict, insights: list, output_path="superstore_report.pdf", alerts: list = None):
+def report_fingerprint(kpis: dict, insights: list, alerts: list = None, chart_keys: list = None) -> str:
+    """
+    Content hash of everything that goes into the report, used as the
+    cache key so identical reports are rendered only once.
+    Charts enter through their chart_render.figure_key() hashes.
+    """
+    payload = json.dumps(
+        {"kpis": kpis, "insights": insights, "alerts": alerts or [], "charts": chart_keys or []},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def generate_pdf_report(df, kpis: dict, insights: list, output_path=None, alerts: list = None,
+                        charts: list = None) -> bytes:
     """
-    Generates a clean, fast business PDF report without heavy charts.
+    Generates a clean, fast business PDF report.
+    The report is rendered in memory and returned as bytes.
     
     Parameters:
     - df: Filtered DataFrame
     - kpis: Dictionary of key performance indicators
     - insights: Business insights
-    - chart_paths: (Ignored) previously used for images
-    - output_path: Filename to save PDF
+    - output_path: Optional filename to also save the PDF to disk
     - alerts: List of business alert strings (losses, drops, etc.)
+    - charts: Pre-rendered chart images (PNG bytes or file paths); rasterize
+      them with chart_render.ChartRasterizer so this stays fast
     """
     pdf = PDFReport()
     pdf.set_auto_page_break(auto=True, margin=20)
@@ -95,63 +134,38 @@ def generate_pdf_report(df, kpis: dict, insights: list, output_path="superstore_
         pdf.add_title("Business Alerts")
         pdf.add_insight_list(alerts)
 
-    # remove charts to improve speed/performance
-    # Previously used chart_paths, now excluded for performance
-    # pdf.add_title("Visual Charts")
-    # for chart in chart_paths:
-    #     pdf.add_image(chart)
+    # Section: Charts (rasterized ahead of time, in parallel and cached)
+    if charts:
+        pdf.add_title("Visual Charts")
+        for chart in charts:
+            pdf.add_image(chart)
 
-    # Save PDF
-    pdf.output(output_path)
-    print(f"PDF Report saved as: {output_path}")
-def generate_alerts(filtered_df: pd.DataFrame) -> list:
-    """
-    Analyze monthly sales and profit from the filtered dataframe
-    and return a list of natural business alerts (losses, outliers, sharp drops).
-    """
-    alerts = []
+    pdf_bytes = pdf.to_bytes()
 
-    if filtered_df.empty:
-        alerts.append("No data available for alert generation.")
-        return alerts
+    # Save PDF (only when a path is requested)
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+        print(f"PDF Report saved as: {output_path}")
 
-    df = filtered_df.copy()
-    df["Month_Year"] = df["Order Date"].dt.to_period("M").astype(str)
-
-    # Monthly aggregation
-    monthly = (
-        df.groupby("Month_Year")[["Sales", "Profit"]]
-        .sum()
-        .reset_index()
-        .sort_values("Month_Year")
-    )
+    return pdf_bytes
+def generate_alerts(filtered_df: pd.DataFrame = None, cells: pd.DataFrame = None, monthly: pd.DataFrame = None) -> list:
+    """
+    Business alerts (losses, sharp drops, outliers, rolling z-score,
+    seasonal and percent-change anomalies) as plain strings for the PDF.
+    Same engine and rules as the dashboard, see alert_engine.py.
 
-    # Detect Loss Months
-    loss_months = monthly[monthly["Profit"] < 0]
-    for _, row in loss_months.iterrows():
-        alerts.append(f"Loss recorded in {row['Month_Year']} -> Profit: ${row['Profit']:,.0f}")
-
-    # Sharp Profit Drops
-    monthly["Profit_Change"] = monthly["Profit"].diff()
-    sharp_drops = monthly[monthly["Profit_Change"] < -5000]
-    for _, row in sharp_drops.iterrows():
-        alerts.append(f"Sharp profit decline in {row['Month_Year']} -> Drop: ${abs(row['Profit_Change']):,.0f}")
-
-    # Sales Outliers using IQR
-    q1 = monthly["Sales"].quantile(0.25)
-    q3 = monthly["Sales"].quantile(0.75)
-    iqr = q3 - q1
-    upper = q3 + 1.5 * iqr
-    lower = q1 - 1.5 * iqr
-    outliers = monthly[(monthly["Sales"] > upper) | (monthly["Sales"] < lower)]
-    for _, row in outliers.iterrows():
-        alerts.append(f"Unusual sales in {row['Month_Year']} -> Sales: ${row['Sales']:,.0f}")
-
-    # Clean streak (optional)
-    if (monthly["Profit"] > 0).all() and len(monthly) > 0:
-        alerts.append("No negative profit months detected during the selected period.")
-
-    return alerts
+    Parameters:
+    - filtered_df: Filtered DataFrame (used only when `cells` is not given)
+    - cells: Sliced cube cells from SalesCube.slice()
+    - monthly: Optional monthly_summary() of the same cells, reused for the overall series
+    """
+    if cells is None and filtered_df is not None:
+        if MONTH_COLUMN in filtered_df.columns:
+            cells = filtered_df.assign(Month=filtered_df[MONTH_COLUMN])
+        else:
+            cells = filtered_df.assign(Month=period_keys(filtered_df["Order Date"], "Month"))
+    return [alert["text"] for alert in business_alerts(cells, monthly=monthly)]
 # ----------------------------------------------
 # Utility: Save Plotly Figure as PNG (for PDF use)
 # ----------------------------------------------
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# HyperLogLog Distinct Counting (numpy, vectorized)
+# ----------------------------------------------
+# A sketch is an array of 2**precision uint8 registers. Merging sketches is
+# an element-wise max, so sketches built per cube cell can be combined for
+# any selection without touching the rows again.
+#
+# Error bound: the relative standard error is about 1.04 / sqrt(2**precision)
+# (precision 11 -> 2.3%, 12 -> 1.6%). Roughly 95% of estimates fall within
+# twice that. Small counts (under ~2.5 * 2**precision) use linear counting
+# and are usually within a fraction of a percent.
+
+DEFAULT_PRECISION = 11
+# Bits below the register index that are ranked. Kept <= 53 so np.frexp
+# sees them exactly as a float64.
+_MAX_TAIL_BITS = 53
+
+
+def hash_values(values) -> np.ndarray:
+    """
+    64-bit hashes of `values`, with np.nan-like values mapped to 0 (ignored).
+
+    Categorical inputs hash each category once and index by code, so a
+    column of millions of repeated IDs costs one hash per distinct ID.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = np.asarray(values.cat.categories, dtype=object)
+        codes = values.cat.codes.to_numpy()
+        hashes = pd.util.hash_array(categories)[codes]
+        hashes[codes < 0] = 0
+        return hashes
+    hashes = pd.util.hash_array(values.to_numpy(dtype=object))
+    hashes[values.isna().to_numpy()] = 0
+    return hashes
+
+
+def register_updates(hashes: np.ndarray, precision=DEFAULT_PRECISION):
+    """
+    (register index, rank) for each non-zero hash.
+
+    The top `precision` bits pick the register; the rank is the position of
+    the first set bit in the remaining bits (leading zeros + 1).
+    """
+    hashes = hashes[hashes != 0]
+    tail_bits = min(64 - precision, _MAX_TAIL_BITS)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    tail = hashes & np.uint64((1 << tail_bits) - 1)
+    # frexp's exponent is the bit length of the tail (0 for a zero tail)
+    _, bit_length = np.frexp(tail.astype(np.float64))
+    rank = (tail_bits + 1 - bit_length).astype(np.uint8)
+    return index, rank
+
+
+def sketch(hashes: np.ndarray, precision=DEFAULT_PRECISION) -> np.ndarray:
+    """Registers of a single sketch over the given hashes."""
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    index, rank = register_updates(hashes, precision)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def estimate(registers: np.ndarray) -> float:
+    """
+    Cardinality estimate of one sketch (standard HyperLogLog estimator
+    with linear counting for small ranges).
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.ldexp(1.0, -registers.astype(np.int64)).sum()
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return float(raw)
+
+
+def relative_error(precision=DEFAULT_PRECISION) -> float:
+    """Relative standard error of an estimate at the given precision."""
+    return 1.04 / np.sqrt(1 << precision)
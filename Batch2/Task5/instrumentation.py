@@ -0,0 +1,194 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# ----------------------------------------------
+# Per-Section Timing & Memory Instrumentation
+# ----------------------------------------------
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _memory_now():
+    """
+    (bytes, source): traced Python allocations when tracemalloc is on,
+    otherwise the process RSS (Linux), otherwise (None, None).
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0], "tracemalloc"
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE, "rss"
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+
+class RerunProfile:
+    """
+    Timings of one dashboard rerun, section by section.
+
+    Two ways to mark sections:
+    - `with profile.section("alerts", rows=n): ...` around a block
+    - `profile.start("trend_chart")` in straight-line script code: the
+      previous section ends where the next one starts
+
+    Each section records wall time, rows touched (when given) and memory
+    growth: allocated bytes if tracemalloc is tracing, else RSS change.
+    Memory figures are process-wide, so concurrent sessions blur them.
+    """
+
+    def __init__(self, collector=None, rerun_id=None):
+        self.collector = collector
+        self.rerun_id = rerun_id
+        self.started = time.time()
+        self.sections = []
+        self._open = None
+        self._clock = time.perf_counter()
+
+    def start(self, name, rows=None):
+        """Ends the running section (if any) and starts `name`."""
+        self._close()
+        memory, source = _memory_now()
+        self._open = {"section": name, "rows": rows, "t0": time.perf_counter(),
+                      "mem0": memory, "memory_source": source}
+
+    def rows(self, rows):
+        """Sets the row count of the running section once it is known."""
+        if self._open is not None:
+            self._open["rows"] = int(rows)
+
+    @contextlib.contextmanager
+    def section(self, name, rows=None):
+        self.start(name, rows)
+        try:
+            yield self
+        finally:
+            self._close()
+
+    def _close(self):
+        if self._open is None:
+            return
+        opened, self._open = self._open, None
+        memory, _ = _memory_now()
+        self.sections.append({
+            "section": opened["section"],
+            "wall_ms": (time.perf_counter() - opened["t0"]) * 1000,
+            "rows": opened["rows"],
+            "memory_bytes": memory - opened["mem0"] if memory is not None and opened["mem0"] is not None else None,
+            "memory_source": opened["memory_source"],
+        })
+
+    def finish(self) -> dict:
+        """Closes the profile and hands it to the collector."""
+        self._close()
+        record = {
+            "rerun": self.rerun_id,
+            "timestamp": self.started,
+            "total_ms": (time.perf_counter() - self._clock) * 1000,
+            "sections": self.sections,
+        }
+        if self.collector is not None:
+            self.collector.record(record)
+        return record
+
+
+class MetricsCollector:
+    """
+    Process-wide sink for rerun profiles (one per server via st.cache_resource).
+
+    - Keeps the last `history` reruns for the debug panel
+    - Aggregates count / time / rows / memory per section for Prometheus
+    - Appends every rerun to a JSON-lines file when `jsonl_path` is set
+    - Rewrites a Prometheus text file (node_exporter textfile collector
+      format) after every rerun when `prom_path` is set
+
+    Parameters:
+    - jsonl_path: Optional JSON-lines output file
+    - prom_path: Optional Prometheus text output file
+    - history: Number of recent reruns kept in memory
+    - trace_memory: Start tracemalloc for exact allocation figures (slower)
+    """
+
+    def __init__(self, jsonl_path=None, prom_path=None, history=50, trace_memory=False):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.recent = deque(maxlen=history)
+        self.totals = {}
+        self.reruns = 0
+        self._lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def profile(self) -> RerunProfile:
+        with self._lock:
+            self.reruns += 1
+            rerun_id = self.reruns
+        return RerunProfile(self, rerun_id)
+
+    def record(self, record: dict):
+        with self._lock:
+            self.recent.append(record)
+            for sec in record["sections"]:
+                self._add(sec)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            if self.prom_path:
+                # Write-then-rename so scrapers never read a half-written file
+                tmp = f"{self.prom_path}.tmp"
+                with open(tmp, "w") as f:
+                    f.write(self._prometheus_text())
+                os.replace(tmp, self.prom_path)
+
+    def _add(self, sec):
+        totals = self.totals.setdefault(sec["section"], {
+            "count": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "memory_bytes": 0,
+        })
+        seconds = sec["wall_ms"] / 1000
+        totals["count"] += 1
+        totals["seconds"] += seconds
+        totals["max_seconds"] = max(totals["max_seconds"], seconds)
+        totals["rows"] += sec["rows"] or 0
+        totals["memory_bytes"] += max(sec["memory_bytes"] or 0, 0)
+
+    def timed(self, name):
+        """Decorator recording each call of a function as a one-section profile."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                profile = self.profile()
+                with profile.section(name):
+                    result = func(*args, **kwargs)
+                profile.finish()
+                return result
+            return wrapper
+        return decorator
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            return self._prometheus_text()
+
+    def _prometheus_text(self) -> str:
+        lines = [
+            "# HELP dashboard_reruns_total Dashboard reruns profiled since start.",
+            "# TYPE dashboard_reruns_total counter",
+            f"dashboard_reruns_total {self.reruns}",
+        ]
+        metrics = [
+            ("dashboard_section_seconds_total", "counter", "Wall time spent per section.", "seconds"),
+            ("dashboard_section_runs_total", "counter", "Times each section ran.", "count"),
+            ("dashboard_section_seconds_max", "gauge", "Slowest single run per section.", "max_seconds"),
+            ("dashboard_section_rows_total", "counter", "Rows touched per section.", "rows"),
+            ("dashboard_section_memory_bytes_total", "counter", "Memory growth per section.", "memory_bytes"),
+        ]
+        for metric, kind, help_text, field in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for section, totals in sorted(self.totals.items()):
+                lines.append(f'{metric}{{section="{section}"}} {totals[field]}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# Customer / Product Lookup Index
+# ----------------------------------------------
+
+LOOKUP_COLUMNS = ["Customer Name", "Sub-Category"]
+
+
+class LookupIndex:
+    """
+    Built once at load time for the Customer/Product Lookup panel.
+
+    For each lookup column it keeps the sorted list of names, every row's
+    name code and, per name, the (ascending) row positions where it occurs.
+    A lookup is then an intersection of position arrays with the active
+    filter instead of a boolean scan of the whole frame.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns=LOOKUP_COLUMNS):
+        self.names = {}
+        self.codes = {}
+        self.rows = {}
+        for col in columns:
+            values = df[col].astype("category")
+            categories = values.cat.categories
+            if not categories.is_monotonic_increasing:
+                values = values.cat.reorder_categories(categories.sort_values())
+            codes = values.cat.codes.to_numpy()
+
+            # Group row positions by code; a stable sort keeps each group ascending
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(values.cat.categories) + 1))
+
+            self.names[col] = np.asarray(values.cat.categories, dtype=object)
+            self.codes[col] = codes
+            self.rows[col] = {
+                name: order[bounds[i]:bounds[i + 1]]
+                for i, name in enumerate(self.names[col])
+            }
+
+    def names_in(self, col, rows) -> list:
+        """Sorted names of `col` that occur in the given rows (slice or positions)."""
+        codes = self.codes[col][rows]
+        present = np.bincount(codes[codes >= 0], minlength=len(self.names[col])) > 0
+        return self.names[col][present].tolist()
+
+    def lookup(self, rows, customer=None, product=None) -> np.ndarray:
+        """
+        Row positions inside `rows` that match the selected customer and/or product.
+
+        With neither selected there is no lookup, and the result is empty
+        rather than every filtered row, so an idle panel costs nothing.
+
+        Parameters:
+        - rows: Active filter as a slice or ascending row positions
+        - customer / product: Selected names; empty means "any"
+        """
+        if not customer and not product:
+            return np.empty(0, dtype=np.intp)
+        if isinstance(rows, slice):
+            result = None
+        else:
+            result = np.asarray(rows)
+
+        for col, name in (("Customer Name", customer), ("Sub-Category", product)):
+            if not name:
+                continue
+            positions = self.rows[col].get(name, np.empty(0, dtype=np.intp))
+            if result is None:
+                lo = np.searchsorted(positions, rows.start or 0)
+                hi = np.searchsorted(positions, rows.stop) if rows.stop is not None else len(positions)
+                result = positions[lo:hi]
+            else:
+                result = np.intersect1d(result, positions, assume_unique=True)
+
+        return result
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# Integer Period Keys (Day / Week / Month / Quarter)
+# ----------------------------------------------
+# Keys are int32 and increase by one per period, so grouping, sorting and
+# period-over-period diffs are plain integer work. Labels are formatted
+# only for the handful of periods that end up on screen or in the PDF.
+#
+# - Day:     days since 1970-01-01
+# - Week:    Monday-start weeks; week k starts on day 7k - 3
+# - Month:   year * 12 + (month - 1)
+# - Quarter: year * 4 + (quarter - 1), i.e. month key // 3
+
+GRANULARITIES = ["Day", "Week", "Month", "Quarter"]
+ADJECTIVES = {"Day": "Daily", "Week": "Weekly", "Month": "Monthly", "Quarter": "Quarterly"}
+AXIS_TITLES = {"Day": "Date", "Week": "Week (starting Monday)", "Month": "Month-Year", "Quarter": "Quarter"}
+
+_EPOCH_MONTHS = 1970 * 12
+
+
+def period_keys(dates, granularity="Month") -> np.ndarray:
+    """
+    int32 period key of every date.
+
+    Parameters:
+    - dates: datetime64 values (array, Series or DatetimeIndex)
+    - granularity: One of GRANULARITIES
+    """
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    if granularity == "Day":
+        keys = dates.astype("datetime64[D]").astype(np.int64)
+    elif granularity == "Week":
+        keys = (dates.astype("datetime64[D]").astype(np.int64) + 3) // 7
+    else:
+        keys = dates.astype("datetime64[M]").astype(np.int64) + _EPOCH_MONTHS
+        if granularity == "Quarter":
+            keys = keys // 3
+        elif granularity != "Month":
+            raise ValueError(f"Unknown granularity: {granularity}")
+    return keys.astype(np.int32)
+
+
+def month_key(value) -> int:
+    """Month key of a single Timestamp / Period / date."""
+    return value.year * 12 + value.month - 1
+
+
+def month_to_quarter(keys):
+    """Quarter keys from month keys."""
+    return keys // 3
+
+
+def key_starts(keys, granularity="Month") -> pd.DatetimeIndex:
+    """First day of each keyed period (for time axes)."""
+    keys = np.asarray(keys, dtype=np.int64)
+    if granularity == "Day":
+        days = keys.astype("datetime64[D]")
+    elif granularity == "Week":
+        days = (keys * 7 - 3).astype("datetime64[D]")
+    else:
+        months = keys * 3 if granularity == "Quarter" else keys
+        days = (months - _EPOCH_MONTHS).astype("datetime64[M]").astype("datetime64[D]")
+    return pd.DatetimeIndex(days)
+
+
+def key_labels(keys, granularity="Month") -> list:
+    """
+    Display labels: "2014-03-05" (day), week start date (week),
+    "2014-03" (month) and "2014Q1" (quarter), as str(Period) prints them.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    if granularity == "Quarter":
+        return [f"{key // 4}Q{key % 4 + 1}" for key in keys.tolist()]
+    if granularity == "Month":
+        return np.datetime_as_string((keys - _EPOCH_MONTHS).astype("datetime64[M]"), unit="M").tolist()
+    return np.datetime_as_string(key_starts(keys, granularity).to_numpy(), unit="D").tolist()
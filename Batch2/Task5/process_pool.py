@@ -0,0 +1,59 @@
+import contextlib
+import multiprocessing
+import os
+import site
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+# ----------------------------------------------
+# Process Pools Usable from a Streamlit Script
+# ----------------------------------------------
+
+# Directory of the dashboard modules that pool workers import (report_jobs, chart_render, ...)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_main_swap_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _detached_main():
+    """
+    Hides the running script from spawned workers.
+
+    Streamlit executes app.py as the `__main__` module, and spawn re-runs
+    `__main__.__file__` in every new child, which would start the whole
+    dashboard inside the pool. Worker processes are launched during
+    submit(), so the real main module is swapped out only for that call.
+    """
+    with _main_swap_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
+
+
+class ScriptSafePool(ProcessPoolExecutor):
+    """
+    ProcessPoolExecutor for work submitted from Streamlit scripts.
+
+    Uses spawn (forking the multi-threaded Streamlit server is not safe)
+    and keeps new workers from re-executing app.py.
+
+    A spawned worker starts with the parent's sys.path of that moment.
+    Streamlit only adds the script's directory while a run executes, and
+    workers are also launched later from callback threads, so each worker
+    adds APP_DIR itself. The initializer must be importable without that
+    directory, hence site.addsitedir rather than a function from here.
+    """
+
+    def __init__(self, max_workers=None):
+        super().__init__(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                         initializer=site.addsitedir, initargs=(APP_DIR,))
+
+    def submit(self, fn, /, *args, **kwargs):
+        with _detached_main():
+            return super().submit(fn, *args, **kwargs)
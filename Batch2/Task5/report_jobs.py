@@ -0,0 +1,209 @@
+import itertools
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from generate_report import generate_pdf_report, report_fingerprint
+from process_pool import ScriptSafePool
+
+# ----------------------------------------------
+# Background PDF Report Jobs (process pool)
+# ----------------------------------------------
+
+QUEUED, CHARTS, RUNNING, DONE, FAILED = "queued", "charts", "running", "done", "failed"
+
+
+def render_report(kpis: dict, insights: list, alerts: list = None, charts: list = None) -> bytes:
+    """Worker entry point: renders one report in a pool process."""
+    return generate_pdf_report(None, kpis, insights, alerts=alerts, charts=charts)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when more report jobs are pending than the queue allows."""
+
+
+class ReportJobManager:
+    """
+    Renders PDFReport documents in a process pool so neither the Streamlit
+    script thread nor the GIL is tied up while FPDF lays out pages.
+
+    submit() returns a job id straight away; status() and result() are
+    polled from the UI. Finished reports are stored in `cache` (a
+    ResultCache keyed by report_fingerprint), so a report that was already
+    rendered completes immediately without touching the pool. Reports that
+    are missing a chart (rasterizing it failed) are served but not cached.
+
+    When charts are passed and a ChartRasterizer is configured, the job
+    first rasterizes them (status "charts") and then lays out the PDF.
+
+    result() hands the PDF over and forgets the job. Jobs nobody collects
+    (e.g. the browser tab was closed) are dropped `finished_ttl` seconds
+    after they finish, and at most `max_finished` finished jobs are kept,
+    so their PDF bytes do not pile up in the server process.
+
+    Parameters:
+    - max_workers: Pool size
+    - max_queue: Maximum number of unfinished jobs before submit() refuses
+    - cache: Optional ResultCache for rendered reports
+    - rasterizer: Optional ChartRasterizer for the "Visual Charts" section
+    - finished_ttl: Seconds a finished, uncollected job is kept
+    - max_finished: Maximum number of finished, uncollected jobs kept
+    """
+
+    def __init__(self, max_workers=2, max_queue=16, cache=None, rasterizer=None,
+                 finished_ttl=900.0, max_finished=32):
+        self.max_queue = max_queue
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.cache = cache
+        self.rasterizer = rasterizer
+        self.max_workers = max_workers
+        self._pool = ScriptSafePool(max_workers=max_workers)
+        self._pool_lock = threading.Lock()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, kpis: dict, insights: list, alerts: list = None, charts: list = None) -> str:
+        """
+        Queues a report and returns its job id.
+
+        Parameters:
+        - kpis / insights / alerts: Report content, see generate_pdf_report()
+        - charts: Optional Plotly figures for the "Visual Charts" section
+        """
+        if self.rasterizer is None:
+            charts = None
+        chart_keys = [self.rasterizer.key(fig) for fig in charts] if charts else []
+        key = report_fingerprint(kpis, insights, alerts, chart_keys)
+        job_id = f"report-{next(self._ids)}"
+        job = {"key": key, "submitted": time.time(), "finished": None, "future": None, "error": None}
+
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            job.update(status=DONE, result=cached, finished=time.time())
+            with self._lock:
+                self._jobs[job_id] = job
+                self._prune()
+            return job_id
+
+        with self._lock:
+            if self.pending() >= self.max_queue:
+                raise QueueFullError("Too many reports are being generated right now. Please try again shortly.")
+            job.update(status=CHARTS if charts else QUEUED, result=None)
+            self._jobs[job_id] = job
+
+        if charts:
+            self.rasterizer.submit(charts).add_done_callback(
+                lambda images, job_id=job_id: self._render(job_id, kpis, insights, alerts, images.result())
+            )
+        else:
+            self._render(job_id, kpis, insights, alerts, None)
+        return job_id
+
+    def _render(self, job_id, kpis, insights, alerts, images):
+        # Charts that could not be rasterized are left out, not fatal. Such a
+        # report is not cached: its fingerprint names charts it does not contain
+        complete = all(image is not None for image in images or [])
+        images = [image for image in images or [] if image is not None]
+        pool = self._pool
+        try:
+            try:
+                future = pool.submit(render_report, kpis, insights, alerts, images)
+            except BrokenProcessPool:
+                pool = self._replace_pool(pool)
+                future = pool.submit(render_report, kpis, insights, alerts, images)
+        except Exception as e:
+            with self._lock:
+                if job_id in self._jobs:
+                    self._jobs[job_id].update(status=FAILED, error=str(e), finished=time.time())
+            return
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["future"] = future
+            job["pool"] = pool
+            job["status"] = QUEUED
+            job["cacheable"] = complete
+        future.add_done_callback(lambda future, job_id=job_id: self._finish(job_id, future))
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["finished"] = time.time()
+            broken = False
+            try:
+                job["result"] = future.result()
+                job["status"] = DONE
+            except Exception as e:
+                job["error"] = str(e)
+                job["status"] = FAILED
+                broken = isinstance(e, BrokenProcessPool)
+            self._prune()
+        if broken:
+            # A worker died; without a new pool every later report would fail the same way
+            self._replace_pool(job["pool"])
+        if job["status"] == DONE and job["cacheable"] and self.cache is not None:
+            self.cache.put(job["key"], job["result"])
+
+    def _replace_pool(self, broken):
+        """Swaps a broken pool for a fresh one (once, however many jobs notice) and returns the current pool."""
+        with self._pool_lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = ScriptSafePool(max_workers=self.max_workers)
+            return self._pool
+
+    def _prune(self):
+        """Forgets finished jobs older than `finished_ttl`, keeping at most `max_finished` (lock held)."""
+        cutoff = time.time() - self.finished_ttl
+        finished = sorted(
+            (job["finished"], job_id) for job_id, job in self._jobs.items()
+            if job["status"] in (DONE, FAILED)
+        )
+        excess = len(finished) - self.max_finished
+        for i, (finished_at, job_id) in enumerate(finished):
+            if i < excess or finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def pending(self) -> int:
+        """Jobs that are queued, rasterizing charts or rendering."""
+        return sum(1 for job in self._jobs.values() if job["status"] in (QUEUED, CHARTS, RUNNING))
+
+    def status(self, job_id) -> dict:
+        """Status, elapsed seconds and queue position of a job."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"status": "unknown"}
+            if job["status"] == QUEUED and job["future"].running():
+                job["status"] = RUNNING
+            end = job["finished"] or time.time()
+            position = sum(
+                1 for other in self._jobs.values()
+                if other["status"] == QUEUED and other["submitted"] < job["submitted"]
+            )
+            return {
+                "status": job["status"],
+                "elapsed": end - job["submitted"],
+                "queue_position": position if job["status"] == QUEUED else 0,
+                "error": job["error"],
+            }
+
+    def discard(self, job_id):
+        """Drops a job's bookkeeping (e.g. after showing a failure)."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def result(self, job_id):
+        """Returns the PDF bytes of a finished job and forgets the job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != DONE:
+                return None
+            del self._jobs[job_id]
+            return job["result"]
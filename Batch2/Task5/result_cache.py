@@ -0,0 +1,108 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# Filter-Signature Result Cache (LRU, memory-capped)
+# ----------------------------------------------
+
+
+def filter_signature(regions, categories, subcats, start_date, end_date) -> str:
+    """
+    Canonical hash of a sidebar selection.
+
+    Selections are sorted, so picking the same values in a different order
+    maps to the same entry, and dates are normalised to ISO strings.
+    """
+    payload = {
+        "regions": sorted(map(str, regions or [])),
+        "categories": sorted(map(str, categories or [])),
+        "subcats": sorted(map(str, subcats or [])),
+        "start": pd.to_datetime(start_date).isoformat() if start_date is not None else None,
+        "end": pd.to_datetime(end_date).isoformat() if end_date is not None else None,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def estimate_size(value) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Least-recently-used cache bounded by total memory rather than entry count.
+
+    One instance is shared by every session (see st.cache_resource in app.py),
+    so values must be treated as read-only by callers.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                # Larger than the whole budget: serve it, but don't keep it
+                return value
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            # Computed outside the lock so one slow selection doesn't block other sessions
+            value = self.put(key, compute())
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,120 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------
+# Seeded Synthetic Superstore Data (for benchmarks)
+# ----------------------------------------------
+
+REGIONS = [
+    "Africa", "Canada", "Caribbean", "Central", "Central Asia", "East", "EMEA",
+    "North", "North Asia", "Oceania", "South", "Southeast Asia", "West",
+]
+SUBCATEGORIES = {
+    "Furniture": ["Bookcases", "Chairs", "Furnishings", "Tables"],
+    "Office Supplies": ["Appliances", "Art", "Binders", "Envelopes", "Fasteners",
+                        "Labels", "Paper", "Storage", "Supplies"],
+    "Technology": ["Accessories", "Copiers", "Machines", "Phones"],
+}
+SEGMENTS = ["Consumer", "Corporate", "Home Office"]
+DISCOUNTS = np.array([0.0, 0.0, 0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+
+# Same column order as cleaned_global_superstore.csv
+COLUMNS = [
+    "Order Date", "Region", "Category", "Sub-Category", "Customer Name", "Customer ID",
+    "Sales", "Profit", "Quantity", "Discount", "State", "City", "Segment",
+    "Year", "Month", "Month_Num", "Weekday", "Week_Num",
+    "Sales_per_Quantity", "Profit_per_Sale", "Is_Profitable",
+]
+
+
+def generate_superstore(n_rows: int, seed=42, start="2011-01-01", end="2014-12-31", n_customers=None,
+                        chunk_index=0) -> pd.DataFrame:
+    """
+    Generates rows with the cleaned Superstore schema, including the
+    derived columns added in "Clean csv for dashboard.ipynb".
+
+    The same (n_rows, seed, chunk_index) always gives the same frame, so
+    benchmark runs on different commits see identical data.
+
+    Parameters:
+    - n_rows: Number of rows
+    - seed: Random seed
+    - start / end: Order date range
+    - n_customers: Customer pool size (default: about one per 30 rows)
+    - chunk_index: Part number when a large file is written in pieces
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    n_customers = n_customers or max(1000, n_rows // 30)
+
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    # Later dates are drawn more often, so sales grow year over year like the real data
+    offsets = rng.random(n_rows) ** 0.85
+    dates = pd.Timestamp(start) + pd.to_timedelta((offsets * days).astype(np.int64), unit="D")
+    dates = pd.DatetimeIndex(dates)
+
+    subcat_category = np.array([cat for cat, subs in SUBCATEGORIES.items() for _ in subs])
+    subcats = np.array([sub for subs in SUBCATEGORIES.values() for sub in subs])
+    sub_idx = rng.integers(0, len(subcats), n_rows)
+
+    customer = rng.integers(1, n_customers + 1, n_rows)
+    region = rng.integers(0, len(REGIONS), n_rows)
+    quantity = rng.integers(1, 15, n_rows)
+    discount = DISCOUNTS[rng.integers(0, len(DISCOUNTS), n_rows)]
+    unit_price = rng.lognormal(mean=3.2, sigma=1.1, size=n_rows)
+    sales = np.round(unit_price * quantity * (1 - discount), 2)
+    margin = rng.normal(0.15 - 0.6 * discount, 0.2)
+    profit = np.round(sales * margin, 2)
+
+    frame = pd.DataFrame({
+        "Order Date": dates,
+        "Region": np.array(REGIONS)[region],
+        "Category": subcat_category[sub_idx],
+        "Sub-Category": subcats[sub_idx],
+        "Customer Name": pd.Series(customer).map("Customer {}".format).to_numpy(),
+        "Customer ID": pd.Series(customer).map("CU-{:06d}".format).to_numpy(),
+        "Sales": sales,
+        "Profit": profit,
+        "Quantity": quantity,
+        "Discount": discount,
+        "State": np.char.add("State ", (region * 10 + rng.integers(0, 10, n_rows)).astype(str)),
+        "City": np.char.add("City ", (region * 100 + rng.integers(0, 100, n_rows)).astype(str)),
+        "Segment": np.array(SEGMENTS)[customer % len(SEGMENTS)],
+    })
+
+    # Derived columns, as in the cleaning notebook
+    frame["Year"] = dates.year
+    frame["Month"] = dates.month_name()
+    frame["Month_Num"] = dates.month
+    frame["Weekday"] = dates.day_name()
+    frame["Week_Num"] = dates.isocalendar().week.to_numpy()
+    frame["Sales_per_Quantity"] = frame["Sales"] / frame["Quantity"]
+    frame["Profit_per_Sale"] = frame["Profit"] / frame["Sales"]
+    frame["Is_Profitable"] = np.where(frame["Profit"] > 0, "Yes", "No")
+    return frame[COLUMNS]
+
+
+def write_superstore_csv(path, n_rows: int, seed=42, chunk_rows=1_000_000, **kwargs) -> str:
+    """
+    Writes a synthetic Superstore CSV in chunks, so 10M+ rows never have
+    to fit in memory at once. Extra keyword arguments go to
+    generate_superstore().
+    """
+    n_customers = kwargs.pop("n_customers", None) or max(1000, n_rows // 30)
+    written = 0
+    for chunk_index, start in enumerate(range(0, n_rows, chunk_rows)):
+        size = min(chunk_rows, n_rows - start)
+        chunk = generate_superstore(size, seed=seed, n_customers=n_customers, chunk_index=chunk_index, **kwargs)
+        chunk.to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += size
+    return path
+
+
+if __name__ == "__main__":
+    # Usage: python Batch2/Task5/synthetic_data.py <rows> <csv_path> [seed]
+    rows = int(float(sys.argv[1]))
+    out = sys.argv[2]
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    write_superstore_csv(out, rows, seed=seed)
+    print(f"Synthetic data ({rows:,} rows, seed {seed}) saved as: {out}")
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The dashboard modules are flat siblings of app.py (imported as `data_store`, `lookup_index`, ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic_data import generate_superstore  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def superstore():
+    """A small seeded Superstore frame, sorted by Order Date like the Arrow file."""
+    df = generate_superstore(5_000, seed=7, n_customers=300)
+    return df.sort_values("Order Date", kind="stable").reset_index(drop=True)
@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from alert_engine import ALL_PROFITABLE, NO_DATA, AlertEngine, PctChangeRule, SeriesPanel, business_alerts
+from cube import monthly_summary
+from periods import month_key, period_keys
+
+START = month_key(pd.Timestamp("2016-01-01"))
+
+
+def _cells(series, profit=None):
+    """
+    Cube-style cells, one row per series and month.
+
+    Parameters:
+    - series: {(region, category): [monthly sales]}
+    - profit: Optional {(region, category): [monthly profit]} (default 100 a month)
+    """
+    profit = profit or {}
+    rows = [
+        {"Region": region, "Category": category, "Month": START + t, "Sales": sales,
+         "Profit": profit.get((region, category), [100.0] * len(sales_by_month))[t]}
+        for (region, category), sales_by_month in series.items()
+        for t, sales in enumerate(sales_by_month)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_panel_has_the_selection_then_one_row_per_series():
+    panel = SeriesPanel(_cells({("West", "Technology"): [100.0, 200.0], ("East", "Furniture"): [10.0, 20.0]}))
+    assert panel.labels == [None, "East / Furniture", "West / Technology"]
+    assert panel.values["Sales"][0].tolist() == [110.0, 220.0]
+
+
+def test_shared_monthly_frame_gives_the_same_alerts(superstore):
+    cells = superstore.assign(Month=period_keys(superstore["Order Date"], "Month"))
+    monthly = monthly_summary(cells)
+    panel = SeriesPanel(cells, monthly=monthly)
+    assert panel.values["Sales"][0].tolist() == SeriesPanel(cells).values["Sales"][0].tolist()
+    assert business_alerts(cells, monthly=monthly) == business_alerts(cells)
+
+
+def test_empty_selection_gives_the_no_data_message():
+    assert [alert["text"] for alert in business_alerts(pd.DataFrame())] == [NO_DATA]
+
+
+def test_loss_months_are_reported_for_the_selection():
+    sales = [5000.0, 5000.0, 5000.0]
+    alerts = business_alerts(_cells(
+        {("West", "Technology"): sales, ("East", "Furniture"): sales},
+        profit={("West", "Technology"): [100.0, -900.0, 100.0]},
+    ))
+    losses = [alert for alert in alerts if alert["rule"] == "loss"]
+    assert len(losses) == 1
+    assert losses[0]["level"] == "error"
+    assert losses[0]["series"] is None
+    assert ALL_PROFITABLE not in [alert["text"] for alert in alerts]
+
+
+def test_profitable_selection_says_so():
+    alerts = business_alerts(_cells({("West", "Technology"): [5000.0, 5100.0, 5200.0]}))
+    assert alerts[-1]["text"] == ALL_PROFITABLE
+
+
+def test_series_alerts_are_ranked_and_capped():
+    # Eight series whose sales fall by 55% ... 90% in the last month
+    drops = [0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9]
+    series = {(f"Region {i}", "Technology"): [5000.0, 5000.0, 5000.0 * (1 - drop)] for i, drop in enumerate(drops)}
+    alerts = AlertEngine(rules=[PctChangeRule()], max_series_alerts=3).evaluate(SeriesPanel(_cells(series)))
+
+    per_series = [alert for alert in alerts if alert["series"] is not None]
+    assert [alert["series"] for alert in per_series] == ["Region 7 / Technology", "Region 6 / Technology",
+                                                         "Region 5 / Technology"]
+    # The whole selection fell as well and is always listed
+    assert [alert["series"] for alert in alerts].count(None) == 1
+
+
+def _pct_change_alerts(series):
+    return AlertEngine(rules=[PctChangeRule()]).evaluate(SeriesPanel(_cells(series)))
+
+
+def test_single_series_is_reported_once():
+    alerts = _pct_change_alerts({("West", "Technology"): [5000.0, 5000.0, 1000.0]})
+    assert len(alerts) == 1
+    assert alerts[0]["series"] is None
+
+
+@pytest.mark.parametrize("other", [[5000.0, 5000.0, 5000.0], [5000.0, 5000.0, 1000.0]])
+def test_several_series_report_overall_and_per_series(other):
+    alerts = _pct_change_alerts({("West", "Technology"): [5000.0, 5000.0, 500.0], ("East", "Furniture"): other})
+    series = [alert["series"] for alert in alerts]
+    # The overall total fell by more than half only when both series did
+    assert (None in series) == (other[-1] < 5000.0)
+    assert "West / Technology" in series
+    assert len(series) == len(set(series))
+
+
+def test_small_series_swings_are_not_material():
+    # West / Technology falls 90%, but by $900 in a $100k+ selection
+    series = {("West", "Technology"): [1000.0, 1000.0, 100.0], ("East", "Furniture"): [100000.0] * 3}
+    panel = SeriesPanel(_cells(series))
+    assert AlertEngine(rules=[PctChangeRule()]).evaluate(panel) == []
+    material = AlertEngine(rules=[PctChangeRule()], min_series_impact=0.005).evaluate(panel)
+    assert [alert["series"] for alert in material] == ["West / Technology"]
+
+
+def test_realistic_panel_keeps_the_alert_panel_short(superstore):
+    cells = superstore.assign(Month=period_keys(superstore["Order Date"], "Month"))
+    alerts = business_alerts(cells)
+    per_series = [alert for alert in alerts if alert["series"] is not None]
+    # 39 noisy Region / Category series: only the five strongest material hits, across all rules
+    assert len(per_series) == 5
+    assert len({alert["rule"] for alert in per_series}) > 1
+    assert len(alerts) == 22
@@ -0,0 +1,130 @@
+import socket
+import time
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from email_queue import FAILED, SENT, EmailDispatcher  # noqa: E402
+
+
+class RecordingHandler:
+    """Local SMTP handler: records every message with the connection it came in on."""
+
+    def __init__(self, fail_first=0):
+        self.messages = []
+        self.fail_first = fail_first
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.fail_first:
+            self.fail_first -= 1
+            return "451 Temporary failure, try again"
+        self.messages.append({"peer": session.peer, "rcpt": list(envelope.rcpt_tos),
+                              "data": envelope.content})
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    started = []
+
+    def start(**kwargs):
+        handler = RecordingHandler(**kwargs)
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        started.append(controller)
+        return handler, controller.hostname, controller.port
+
+    yield start
+    for controller in started:
+        controller.stop()
+
+
+def _dispatcher(host, port, **kwargs):
+    options = {"use_ssl": False, "backoff": 0.01, "batch_window": 0.2}
+    options.update(kwargs)
+    return EmailDispatcher(host, port, **options)
+
+
+def _wait(dispatcher, job_ids, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        statuses = [dispatcher.status(job_id) for job_id in job_ids]
+        if all(s["status"] in (SENT, FAILED, "unknown") for s in statuses):
+            return statuses
+        time.sleep(0.02)
+    raise AssertionError(f"Jobs did not finish: {statuses}")
+
+
+def test_identical_jobs_share_one_transaction(smtp_server):
+    handler, host, port = smtp_server()
+    dispatcher = _dispatcher(host, port)
+    report = b"%PDF-1.4 report"
+    same = [dispatcher.submit(f"user{i}@example.com", "Report", "Attached.", report, sender="bi@example.com")
+            for i in range(3)]
+    other = dispatcher.submit("boss@example.com", "Other", "Different body.", report, sender="bi@example.com")
+
+    statuses = _wait(dispatcher, same + [other])
+    assert [s["status"] for s in statuses] == [SENT] * 4
+    assert len(handler.messages) == 2
+    batched = next(m for m in handler.messages if len(m["rcpt"]) == 3)
+    assert sorted(batched["rcpt"]) == [f"user{i}@example.com" for i in range(3)]
+    # Batched recipients must not see each other
+    assert b"undisclosed-recipients" in batched["data"]
+
+
+def test_connection_is_reused_between_messages(smtp_server):
+    handler, host, port = smtp_server()
+    dispatcher = _dispatcher(host, port)
+    for subject in ("First", "Second"):
+        _wait(dispatcher, [dispatcher.submit("a@example.com", subject, "Body", sender="bi@example.com")])
+    assert len(handler.messages) == 2
+    assert handler.messages[0]["peer"] == handler.messages[1]["peer"]
+
+
+def test_temporary_failure_is_retried(smtp_server):
+    handler, host, port = smtp_server(fail_first=1)
+    dispatcher = _dispatcher(host, port, max_retries=3)
+    [status] = _wait(dispatcher, [dispatcher.submit("a@example.com", "Retry", "Body", sender="bi@example.com")])
+    assert status["status"] == SENT
+    assert status["attempts"] == 2
+    assert len(handler.messages) == 1
+
+
+def test_failures_beyond_retries_mark_the_job_failed(smtp_server):
+    handler, host, port = smtp_server(fail_first=5)
+    dispatcher = _dispatcher(host, port, max_retries=2)
+    [status] = _wait(dispatcher, [dispatcher.submit("a@example.com", "Retry", "Body", sender="bi@example.com")])
+    assert status["status"] == FAILED
+    assert status["attempts"] == 2
+    assert "451" in status["error"]
+
+
+def test_unbuildable_message_fails_without_stopping_the_worker(smtp_server):
+    handler, host, port = smtp_server()
+    dispatcher = _dispatcher(host, port)
+    bad = dispatcher.submit("a@example.com", "Injected\nBcc: x@example.com", "Body", sender="bi@example.com")
+    [status] = _wait(dispatcher, [bad])
+    assert status["status"] == FAILED
+    assert "Could not build message" in status["error"]
+
+    [status] = _wait(dispatcher, [dispatcher.submit("a@example.com", "Fine", "Body", sender="bi@example.com")])
+    assert status["status"] == SENT
+    assert len(handler.messages) == 1
+
+
+def test_finished_jobs_are_pruned(smtp_server):
+    handler, host, port = smtp_server()
+    dispatcher = _dispatcher(host, port, max_finished=2, batch_window=0.0)
+    job_ids = []
+    for i in range(4):
+        job_ids.append(dispatcher.submit("a@example.com", f"Report {i}", "Body", sender="bi@example.com"))
+        _wait(dispatcher, job_ids[-1:])
+    time.sleep(0.1)
+    assert [dispatcher.status(job_id)["status"] for job_id in job_ids] == ["unknown", "unknown", SENT, SENT]
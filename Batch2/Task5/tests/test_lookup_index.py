@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from lookup_index import LookupIndex
+
+
+@pytest.fixture(scope="module")
+def index(superstore):
+    return LookupIndex(superstore)
+
+
+def _filters(df):
+    """The two shapes a filter result takes: a date slice and a position array."""
+    category = np.flatnonzero(df["Category"].to_numpy() == "Technology")
+    return [slice(0, len(df)), slice(1_000, 3_500), category]
+
+
+def test_idle_rerun_copies_no_rows(index, superstore):
+    # No customer or product selected: nothing to look up, so app.py must not
+    # copy any rows of the selection out of the shared frame
+    for rows in _filters(superstore):
+        for customer, product in [(None, None), ("", ""), ("", None)]:
+            result = index.lookup(rows, customer, product)
+            assert len(result) == 0
+            assert result.dtype == np.intp
+
+
+@pytest.mark.parametrize("customer, product", [(True, None), (None, "Phones"), (True, "Binders")])
+def test_lookup_matches_boolean_mask(index, superstore, customer, product):
+    customer = superstore["Customer Name"].iloc[10] if customer else None
+    for rows in _filters(superstore):
+        in_filter = np.zeros(len(superstore), dtype=bool)
+        in_filter[rows] = True
+        mask = in_filter.copy()
+        if customer:
+            mask &= superstore["Customer Name"].to_numpy() == customer
+        if product:
+            mask &= superstore["Sub-Category"].to_numpy() == product
+        np.testing.assert_array_equal(index.lookup(rows, customer, product), np.flatnonzero(mask))
+
+
+def test_unknown_name_gives_no_rows(index, superstore):
+    assert len(index.lookup(slice(0, len(superstore)), "Nobody", None)) == 0
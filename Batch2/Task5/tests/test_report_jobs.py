@@ -0,0 +1,164 @@
+import io
+import os
+import sys
+import time
+from concurrent.futures import Future
+
+import plotly.graph_objects as go
+import pytest
+from PIL import Image
+
+from chart_render import ChartRasterizer
+from generate_report import report_fingerprint
+from process_pool import APP_DIR
+from report_jobs import DONE, FAILED, QueueFullError, ReportJobManager
+from result_cache import ResultCache
+
+KPIS = {"Total Sales": "$1,000", "Total Profit": "$250"}
+INSIGHTS = ["Technology leads sales."]
+
+
+def _wait(manager, job_id, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = manager.status(job_id)
+        if status["status"] in (DONE, FAILED):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"Report job {job_id} did not finish")
+
+
+def test_report_renders_in_the_pool_and_is_handed_over_once():
+    manager = ReportJobManager(max_workers=1)
+    job_id = manager.submit(KPIS, INSIGHTS, alerts=["Loss recorded in 2016-02"])
+    assert _wait(manager, job_id)["status"] == DONE
+    assert manager.result(job_id).startswith(b"%PDF")
+    assert manager.status(job_id)["status"] == "unknown"
+    assert manager.result(job_id) is None
+
+
+def test_repeated_report_is_served_from_the_cache():
+    cache = ResultCache(max_bytes=16 * 1024 * 1024)
+    manager = ReportJobManager(max_workers=1, cache=cache)
+    first = manager.submit(KPIS, INSIGHTS)
+    assert _wait(manager, first)["status"] == DONE
+    pdf = manager.result(first)
+
+    again = manager.submit(KPIS, INSIGHTS)
+    # Completed at submit time, without a round trip through the pool
+    assert manager.status(again)["status"] == DONE
+    assert manager.result(again) == pdf
+
+
+def test_full_queue_rejects_new_reports():
+    manager = ReportJobManager(max_workers=1, max_queue=0)
+    with pytest.raises(QueueFullError):
+        manager.submit(KPIS, INSIGHTS)
+
+
+def test_report_with_charts_renders_end_to_end():
+    cache = ResultCache(max_bytes=16 * 1024 * 1024)
+    rasterizer = ChartRasterizer(max_workers=1, cache=ResultCache(max_bytes=16 * 1024 * 1024))
+    manager = ReportJobManager(max_workers=1, cache=cache, rasterizer=rasterizer)
+    charts = [
+        go.Figure(go.Scatter(x=["2016-01", "2016-02", "2016-03"], y=[5000, 6200, 4100])),
+        go.Figure(go.Bar(x=["Consumer", "Corporate"], y=[1200, 800])),
+    ]
+    job_id = manager.submit(KPIS, INSIGHTS, charts=charts)
+    status = _wait(manager, job_id)
+    assert status["status"] == DONE, status["error"]
+    # Charts kaleido cannot render (e.g. not installed) are left out, the report itself still renders
+    assert manager.result(job_id).startswith(b"%PDF")
+
+
+def _cached_manager(**kwargs):
+    # Every report below is already cached, so no pool process is started
+    cache = ResultCache(max_bytes=1024 * 1024)
+    manager = ReportJobManager(max_workers=1, cache=cache, **kwargs)
+    return manager, cache
+
+
+def _cached_job(manager, cache, n):
+    insights = [f"Insight {n}"]
+    cache.put(report_fingerprint(KPIS, insights, None, []), b"%PDF " + bytes(n))
+    return manager.submit(KPIS, insights)
+
+
+def test_uncollected_results_are_capped():
+    manager, cache = _cached_manager(max_finished=2)
+    job_ids = [_cached_job(manager, cache, n) for n in range(4)]
+    assert [manager.status(job_id)["status"] for job_id in job_ids] == ["unknown", "unknown", DONE, DONE]
+    assert len(manager._jobs) == 2
+
+
+def test_uncollected_results_expire():
+    manager, cache = _cached_manager(finished_ttl=0.05)
+    job_id = _cached_job(manager, cache, 1)
+    time.sleep(0.1)
+    assert manager.status(job_id)["status"] == "unknown"
+    assert manager._jobs == {}
+
+
+class StubRasterizer:
+    """Hands back fixed PNGs (None = the chart failed to render) instead of running kaleido."""
+
+    def __init__(self, images):
+        self.images = images
+
+    def key(self, fig):
+        return f"chart:{fig}"
+
+    def submit(self, figures):
+        batch = Future()
+        batch.set_result(self.images)
+        return batch
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.new("RGB", (20, 10), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("images, cached", [([_png(), _png()], True), ([_png(), None], False)])
+def test_only_complete_reports_are_cached(images, cached):
+    cache = ResultCache(max_bytes=16 * 1024 * 1024)
+    manager = ReportJobManager(max_workers=1, cache=cache, rasterizer=StubRasterizer(images))
+    job_id = manager.submit(KPIS, INSIGHTS, charts=["trend", "segments"])
+    assert _wait(manager, job_id)["status"] == DONE
+    assert manager.result(job_id).startswith(b"%PDF")
+
+    key = report_fingerprint(KPIS, INSIGHTS, None, ["chart:trend", "chart:segments"])
+    assert (cache.get(key) is not None) is cached
+
+
+@pytest.fixture
+def app_dir_off_sys_path(monkeypatch):
+    """sys.path as after a Streamlit run, which only adds the script's directory while it executes."""
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if os.path.abspath(p) != APP_DIR])
+
+
+def test_report_with_charts_renders_after_the_app_dir_left_sys_path(app_dir_off_sys_path):
+    rasterizer = ChartRasterizer(max_workers=1, cache=ResultCache(max_bytes=16 * 1024 * 1024))
+    manager = ReportJobManager(max_workers=1, rasterizer=rasterizer)
+    job_id = manager.submit(KPIS, INSIGHTS, charts=[go.Figure(go.Bar(x=["Consumer", "Corporate"], y=[1200, 800]))])
+    status = _wait(manager, job_id)
+    assert status["status"] == DONE, status["error"]
+    assert manager.result(job_id).startswith(b"%PDF")
+
+
+def test_crashed_worker_does_not_break_later_reports():
+    manager = ReportJobManager(max_workers=1)
+    first = manager.submit(KPIS, INSIGHTS)
+    assert _wait(manager, first)["status"] == DONE
+    pool = manager._pool
+    for process in list(pool._processes.values()):
+        process.kill()
+        process.join()
+
+    # The job that meets the dead worker may fail; the pool is replaced either way
+    job_id = manager.submit(KPIS, ["Second report"])
+    if _wait(manager, job_id)["status"] == FAILED:
+        job_id = manager.submit(KPIS, ["Third report"])
+    assert _wait(manager, job_id)["status"] == DONE
+    assert manager._pool is not pool
@@ -1,18 +1,23 @@
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent
+# The shared model registry lives in model_serving/ at the repo root;
+# Streamlit re-executes this script on every rerun, so add the path once
+REPO_DIR = str(BASE_DIR.parent)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
 
-MODEL_PATH = BASE_DIR / "Task2_xgb_credit_risk_prediction.pkl"
 roc_path = BASE_DIR / "roc_curve_task2.png"
 cm_path = BASE_DIR / "confusion_matrix_task2.png"
 import streamlit as st
-import pandas as pd
 import numpy as np
-import joblib
 from PIL import Image
+from model_serving.registry import get_model
 
-# Load the trained pipeline
-pipeline = joblib.load(MODEL_PATH)
+# Trained pipeline, loaded (and warmed up) once per process rather than on every rerun;
+# its file path is set in MODEL_SPECS (model_serving/models.py)
+model = get_model("credit_risk")
 
 # Set page configuration
 st.set_page_config(page_title="Loan Risk Prediction", layout="wide")
@@ -125,24 +130,25 @@ cred_length = st.number_input(
     help="Number of years since the applicant's first credit line."
 )
 
-# Prepare input data
-input_data = pd.DataFrame({
-    'Age': [age],
-    'Income': [income],
-    'Home': [home],
-    'Emp_length': [emp_length],
-    'Intent': [intent],
-    'Amount': [amount],
-    'Rate': [rate],
-    'Status': [status],
-    'Percent_income': [percent_income],
-    'Cred_length': [cred_length]
-})
+# Prepare input data (one plain record; the model encodes it without building a DataFrame)
+input_data = {
+    'Age': age,
+    'Income': income,
+    'Home': home,
+    'Emp_length': emp_length,
+    'Intent': intent,
+    'Amount': amount,
+    'Rate': rate,
+    'Status': status,
+    'Percent_income': percent_income,
+    'Cred_length': cred_length
+}
 
 # Prediction
 if st.button("Predict Loan Default Risk"):
-    prediction = pipeline.predict(input_data)
-    prediction_proba = pipeline.predict_proba(input_data)[0][1]
+    # One predict_proba call; the label uses the model's threshold (CREDIT_RISK_THRESHOLD, default 0.5)
+    proba, prediction = model.predict([input_data])
+    prediction_proba = proba[0]
 
     st.subheader("Prediction Result:")
     if prediction[0] == 1:
@@ -0,0 +1,199 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent
+
+MODEL_PATH = BASE_DIR / "Task2_xgb_credit_risk_prediction.pkl"
+
+# Usage (from the repo root):
+#   python Task2_Credit_Risk_Prediction/batch_score.py applications.csv scores.csv
+#   python Task2_Credit_Risk_Prediction/batch_score.py applications.parquet scores.parquet \
+#       --chunk-size 200000 --workers 8 --id-column Application_ID
+#
+# The input needs the same columns as the Streamlit form (see app.py);
+# extra columns are ignored unless passed through with --id-column.
+
+PROBA_COLUMN = "Default_Probability"
+PREDICTION_COLUMN = "Default_Prediction"
+
+# Set once per worker process by _init_worker()
+_pipeline = None
+
+
+def _init_worker(model_path, threads):
+    """Loads the pipeline once per worker process."""
+    global _pipeline
+    _pipeline = joblib.load(model_path)
+    # One XGBoost thread per process by default, so N workers use N cores.
+    # Set directly: get_params()/set_params() can fail on models pickled
+    # with another xgboost version.
+    classifier = _pipeline.named_steps["classifier"]
+    classifier.n_jobs = threads
+    classifier.get_booster().set_param({"nthread": threads})
+
+
+def _score_chunk(chunk: pd.DataFrame, features) -> np.ndarray:
+    return _pipeline.predict_proba(chunk[features])[:, 1]
+
+
+def read_chunks(path, chunk_size: int, columns):
+    """
+    Yields the input as DataFrames of at most `chunk_size` rows, so only
+    one chunk per in-flight job is ever held in memory.
+
+    Parameters:
+    - path: .csv or .parquet file
+    - chunk_size: Rows per chunk
+    - columns: Columns to read (everything else is skipped)
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq  # optional, only needed for Parquet
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+    else:
+        raise ValueError(f"Unsupported input format: {path} (use .csv or .parquet)")
+
+
+def input_columns(path) -> list:
+    """Column names of the input file, read without loading any rows."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).schema_arrow.names
+    if suffix == ".csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    raise ValueError(f"Unsupported input format: {path} (use .csv or .parquet)")
+
+
+class ScoreWriter:
+    """Appends scored chunks to a CSV or Parquet file as they finish."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = Path(path).suffix.lower() == ".parquet"
+        self._writer = None
+        self._first = True
+
+    def write(self, frame: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(input_path, output_path, model_path=MODEL_PATH, chunk_size=100_000, workers=None,
+               threads_per_worker=1, id_column=None, threshold=0.5, max_pending=None, log=sys.stderr) -> dict:
+    """
+    Scores every row of `input_path` with the credit-risk pipeline and
+    writes the probabilities to `output_path`, in input order.
+
+    Chunks are scored in a process pool (the model is loaded once per
+    worker). At most `max_pending` chunks are read ahead, so memory stays
+    bounded by chunk_size x max_pending rows whatever the input size.
+
+    Parameters:
+    - input_path / output_path: .csv or .parquet files
+    - model_path: Pickled pipeline
+    - chunk_size: Rows per chunk
+    - workers: Worker processes (default: CPU count)
+    - threads_per_worker: XGBoost threads inside each worker
+    - id_column: Optional input column copied to the output (e.g. an application ID)
+    - threshold: Probability at or above which Default_Prediction is 1
+    - max_pending: Chunks in flight (default: 2 x workers)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+
+    # Feature names the pipeline was fitted on; checked before any work starts
+    features = list(joblib.load(model_path).feature_names_in_)
+    columns = features + ([id_column] if id_column and id_column not in features else [])
+    missing = [col for col in columns if col not in input_columns(input_path)]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+
+    writer = ScoreWriter(output_path)
+    pending = deque()
+    rows = 0
+    started = time.perf_counter()
+
+    def flush_oldest():
+        nonlocal rows
+        chunk_ids, future = pending.popleft()
+        proba = future.result()
+        out = pd.DataFrame({PROBA_COLUMN: proba, PREDICTION_COLUMN: (proba >= threshold).astype(np.int8)})
+        if chunk_ids is not None:
+            out.insert(0, id_column, chunk_ids)
+        writer.write(out)
+        rows += len(out)
+        elapsed = time.perf_counter() - started
+        print(f"Scored {rows:,} rows ({rows / elapsed:,.0f} rows/sec)", file=log)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(str(model_path), threads_per_worker)) as pool:
+            for chunk in read_chunks(input_path, chunk_size, columns):
+                chunk_ids = chunk[id_column].to_numpy() if id_column else None
+                pending.append((chunk_ids, pool.submit(_score_chunk, chunk, features)))
+                # Results are written in input order; wait for the oldest before reading further
+                if len(pending) >= max_pending:
+                    flush_oldest()
+            while pending:
+                flush_oldest()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score loan applications with the credit-risk model.")
+    parser.add_argument("input", help="Applications (.csv or .parquet)")
+    parser.add_argument("output", help="Scores (.csv or .parquet)")
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="XGBoost threads per worker")
+    parser.add_argument("--id-column", help="Input column copied to the output")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Probability cut-off for Default_Prediction")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = score_file(
+            args.input, args.output, model_path=args.model, chunk_size=args.chunk_size,
+            workers=args.workers, threads_per_worker=args.threads_per_worker,
+            id_column=args.id_column, threshold=args.threshold,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Done: {stats['rows']:,} rows in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec). Scores saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,25 @@
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent
+# The shared model registry lives in model_serving/ at the repo root;
+# Streamlit re-executes this script on every rerun, so add the path once
+REPO_DIR = str(BASE_DIR.parent)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
 
-MODEL_PATH = BASE_DIR / "task3_churn_modeling.pkl"
 roc_path = BASE_DIR / "roc_curve_task3.png"
 cm_path = BASE_DIR / "cm_task3.png"
 fi_path = BASE_DIR / "feature_imp_task3.png"
 shap_path = BASE_DIR / "shap_summary_plot_task3.png"
 import streamlit as st
-import joblib
-import pandas as pd
 import numpy as np
 from PIL import Image
+from model_serving.registry import get_model
 
-# Load the trained model
-model_pipeline = joblib.load(MODEL_PATH)
+# Trained model, loaded (and warmed up) once per process rather than on every rerun;
+# its file path is set in MODEL_SPECS (model_serving/models.py)
+model = get_model("churn")
 
 # Streamlit App
 st.set_page_config(page_title="Bank Customer Churn Prediction", layout="wide")
@@ -48,23 +53,23 @@ with tabs[0]:
 
     # Predict button
     if st.button("Predict Churn"):
-        # Prepare data
-        input_data = pd.DataFrame({
-            'Geography': [geography],
-            'Gender': [gender],
-            'CreditScore': [credit_score],
-            'Age': [age],
-            'Tenure': [tenure],
-            'Balance': [balance],
-            'EstimatedSalary': [estimated_salary],
-            'NumOfProducts': [num_of_products],
-            'HasCrCard': [has_crcard],
-            'IsActiveMember': [is_active_member]
-        })
-
-        # Predict probability and class
-        prob = model_pipeline.predict_proba(input_data)[0][1]
-        pred_class = model_pipeline.predict(input_data)[0]
+        # Prepare data (one plain record; the model encodes it without building a DataFrame)
+        input_data = {
+            'Geography': geography,
+            'Gender': gender,
+            'CreditScore': credit_score,
+            'Age': age,
+            'Tenure': tenure,
+            'Balance': balance,
+            'EstimatedSalary': estimated_salary,
+            'NumOfProducts': num_of_products,
+            'HasCrCard': has_crcard,
+            'IsActiveMember': is_active_member
+        }
+
+        # Probability and class from one predict_proba call (threshold: CHURN_THRESHOLD, default 0.5)
+        proba, prediction = model.predict([input_data])
+        prob, pred_class = proba[0], prediction[0]
 
         # Result
         st.subheader("Prediction Result:")
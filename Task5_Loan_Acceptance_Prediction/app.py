@@ -1,19 +1,24 @@
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent
+# The shared model registry lives in model_serving/ at the repo root;
+# Streamlit re-executes this script on every rerun, so add the path once
+REPO_DIR = str(BASE_DIR.parent)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
 
-MODEL_PATH = BASE_DIR / "task5_loan_acceptance_pred.pkl"
 roc_path = BASE_DIR / "roc_curve_task5.png"
 cm_path = BASE_DIR / "cm_task5.png"
 fi_path = BASE_DIR / "feature_importance_task5.png"
 pr_path = BASE_DIR / "pr_curve_task5.png"
 import streamlit as st
-import pandas as pd
-import joblib
 from PIL import Image
+from model_serving.registry import get_model
 
-# Load the trained pipeline
-model_pipeline = joblib.load(MODEL_PATH)
+# Trained pipeline, loaded (and warmed up) once per process rather than on every rerun;
+# its file path is set in MODEL_SPECS (model_serving/models.py)
+model = get_model("loan_acceptance")
 
 # Sidebar About section (Always visible)
 with st.sidebar:
@@ -88,32 +93,33 @@ with tab1:
     loan = st.selectbox("Personal Loan?", ['no', 'yes'],
                         help="Whether the customer has a personal loan.")
 
-    # Prepare input DataFrame
-    input_data = pd.DataFrame({
-        'balance': [balance],
-        'duration': [duration],
-        'campaign': [campaign],
-        'pdays': [pdays],
-        'previous': [previous],
-        'age': [age],
-        'day': [day],
-        'job': [job],
-        'marital': [marital],
-        'education': [education],
-        'contact': [contact],
-        'month': [month],
-        'poutcome': [poutcome],
-        'default': [default],
-        'housing': [housing],
-        'loan': [loan]
-    })
-    for col in ['default', 'housing', 'loan']:
-        input_data[col] = input_data[col].map({'no': 0, 'yes': 1})
+    # Prepare input record (the model maps the 'no'/'yes' answers to 0/1 and
+    # encodes the record without building a DataFrame)
+    input_data = {
+        'balance': balance,
+        'duration': duration,
+        'campaign': campaign,
+        'pdays': pdays,
+        'previous': previous,
+        'age': age,
+        'day': day,
+        'job': job,
+        'marital': marital,
+        'education': education,
+        'contact': contact,
+        'month': month,
+        'poutcome': poutcome,
+        'default': default,
+        'housing': housing,
+        'loan': loan
+    }
 
     # Predict button
     if st.button("Predict Offer Acceptance"):
-        prediction = model_pipeline.predict(input_data)[0]
-        prob = model_pipeline.predict_proba(input_data)[0][1]  # probability of class 1
+        # Probability of class 1 and the label from one predict_proba call
+        # (threshold: LOAN_ACCEPTANCE_THRESHOLD, default 0.5)
+        proba, labels = model.predict([input_data])
+        prob, prediction = proba[0], labels[0]
 
         if prediction == 1:
             st.success(f"The customer is LIKELY to ACCEPT the loan offer. Probability: {prob:.2f}")
@@ -0,0 +1,7 @@
+"""
+Local HTTP inference service for the credit-risk (Task 2), churn (Task 3)
+and loan-acceptance (Task 5) pipelines.
+
+Run from the repo root:
+    python -m model_serving --port 8000
+"""
@@ -0,0 +1,3 @@
+from model_serving.server import main
+
+main()
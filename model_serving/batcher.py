@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from model_serving.metrics import RollingStats
+
+# ----------------------------------------------
+# Dynamic Micro-Batching (one queue + worker per model)
+# ----------------------------------------------
+
+
+class QueueFullError(Exception):
+    """Raised when a model's queue is at capacity; callers should retry later."""
+
+
+class BatchTooLargeError(Exception):
+    """Raised for a list of records larger than the whole queue; it can never be accepted."""
+
+
+class _Request:
+    __slots__ = ("record", "future", "enqueued")
+
+    def __init__(self, record):
+        self.record = record
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesces single-record requests for one model into batches.
+
+    A worker thread takes the oldest queued request, then keeps collecting
+    until `max_batch` records are gathered or `max_wait_ms` has passed since
+    that first one, and scores the batch in one predict_proba call. Under
+    light load a request waits at most `max_wait_ms`; under heavy load
+    batches fill up and the per-call overhead is shared.
+
+    The queue is bounded: submit() raises QueueFullError when `max_queue`
+    requests are already waiting, so overload is pushed back to callers
+    instead of growing latency without limit. submit_many() queues a list
+    of records all together or not at all.
+
+    Parameters:
+    - model: Object with predict_proba(records) -> probabilities (see models.ServedModel)
+    - max_batch: Most records scored in one call
+    - max_wait_ms: Longest a batch waits to fill after its first request
+    - max_queue: Most requests waiting before new ones are rejected
+    """
+
+    def __init__(self, model, max_batch=64, max_wait_ms=2.0, max_queue=1024):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.latency_ms = RollingStats()
+        self.queue_ms = RollingStats()
+        self.inference_ms = RollingStats()
+        self.batch_size = RollingStats()
+        self.rejected = 0
+        self.failed = 0
+        self._closed = False
+        # Held while putting, so a capacity check stays true until the records are queued
+        self._put_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{getattr(model, 'name', 'model')}",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict) -> Future:
+        """Queues one record; the Future resolves to its probability."""
+        return self.submit_many([record])[0]
+
+    def submit_many(self, records) -> list:
+        """
+        Queues every record or none of them; returns one Future per record.
+
+        Raises BatchTooLargeError when there are more records than the queue
+        holds and QueueFullError when they do not fit right now.
+        """
+        if self._closed:
+            raise RuntimeError("Batcher is closed")
+        capacity = self._queue.maxsize
+        if capacity > 0 and len(records) > capacity:
+            self.rejected += len(records)
+            raise BatchTooLargeError(f"{len(records)} records exceed the queue size of {capacity}")
+        requests = [_Request(record) for record in records]
+        with self._put_lock:
+            # Only the worker takes from the queue, so free space can only grow until we put
+            if capacity > 0 and self._queue.qsize() + len(requests) > capacity:
+                self.rejected += len(requests)
+                raise QueueFullError(f"Queue full ({self._queue.qsize()} of {capacity} requests waiting)")
+            for request in requests:
+                self._queue.put_nowait(request)
+        return [request.future for request in requests]
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        """Blocks for the first request, then gathers a batch within the wait window."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # finish this batch, stop on the next loop
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            self.queue_ms.add_many([(started - r.enqueued) * 1000 for r in batch])
+            try:
+                probabilities = self.model.predict_proba([r.record for r in batch])
+                results = [(r, float(p), None) for r, p in zip(batch, probabilities)]
+            except Exception:
+                # One bad record must not fail its neighbours: score them one by one
+                results = [self._score_alone(r) for r in batch]
+            done = time.perf_counter()
+            self.inference_ms.add((done - started) * 1000)
+            self.batch_size.add(len(batch))
+
+            for request, probability, error in results:
+                if error is None:
+                    request.future.set_result(probability)
+                else:
+                    self.failed += 1
+                    request.future.set_exception(error)
+            self.latency_ms.add_many([(done - r.enqueued) * 1000 for r in batch])
+
+    def _score_alone(self, request):
+        try:
+            return request, float(self.model.predict_proba([request.record])[0]), None
+        except Exception as e:
+            return request, None, e
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth(),
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "latency_ms": self.latency_ms.summary(),
+            "queue_ms": self.queue_ms.summary(),
+            "inference_ms": self.inference_ms.summary(),
+            "batch_size": self.batch_size.summary(),
+        }
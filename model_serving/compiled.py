@@ -0,0 +1,347 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from model_serving.features import CompiledPreprocessor, CompileError
+from model_serving.models import MODEL_SPECS, ServedModel, load_model
+
+# ----------------------------------------------
+# Compiled Scorer (fitted preprocessor + XGBoost trees as flat arrays)
+# ----------------------------------------------
+# Usage (from the repo root):
+#   python -m model_serving.compiled credit_risk
+#   python -m model_serving.compiled loan_acceptance --rows 50000 --output loan_acceptance.compiled.joblib
+#
+# Export reads the ColumnTransformer's fitted parameters and every tree of
+# the booster out of the .pkl, checks that the result reproduces the
+# pipeline's predict_proba to 1e-6 on generated records (parity check) and
+# saves it with joblib. Scoring then needs only NumPy: no DataFrame, no
+# sklearn transform chain, no DMatrix.
+
+PARITY_TOLERANCE = 1e-6
+# Rows traversed at once; small blocks keep the (rows x trees) index arrays in cache
+BATCH_ROWS = 128
+# Trees are stored as perfect binary trees, i.e. 2**depth leaves each
+MAX_DEPTH = 12
+
+
+# ----------------------------------------------
+# Trees
+# ----------------------------------------------
+
+class CompiledTrees:
+    """
+    A binary:logistic gbtree booster as perfect binary trees in heap order.
+
+    Every tree is padded to the deepest tree's depth D (heap order: node i
+    has children 2i+1 and 2i+2), and all trees are laid out in flat arrays.
+    Traversal is D rounds of `node = left[node] + go_right` over all trees
+    and rows at once, with no per-node branching; the last round lands in
+    the leaf array. Real leaves above depth D are copied to all of their
+    padded descendants. Splits follow XGBoost: float32 features,
+    left when x < threshold, missing (NaN) goes the node's default way.
+
+    Parameters:
+    - booster: Fitted xgboost.Booster
+    - iteration_limit: Use only the first N boosting rounds (e.g. best_iteration + 1)
+    """
+
+    def __init__(self, booster, iteration_limit=None):
+        model = json.loads(booster.save_raw("json"))
+        learner = model["learner"]
+        objective = learner["objective"]["name"]
+        if objective != "binary:logistic" or learner["gradient_booster"]["name"] != "gbtree":
+            raise CompileError(f"Only binary:logistic gbtree boosters are supported (got {objective})")
+
+        trees = learner["gradient_booster"]["model"]["trees"][:iteration_limit]
+        if any(any(tree["split_type"]) for tree in trees):
+            raise CompileError("Categorical splits are not supported")
+
+        self.depth = max(_tree_depth(tree) for tree in trees)
+        if self.depth > MAX_DEPTH:
+            raise CompileError(f"Trees of depth {self.depth} are too deep to pad (max {MAX_DEPTH})")
+        internal, leaves = 2 ** self.depth - 1, 2 ** self.depth
+
+        self.n_trees = len(trees)
+        self.internal = internal
+        # (tree, heap position) flattened to tree * size + position, so each
+        # level is a handful of np.take calls on flat arrays
+        self.feature = np.zeros(self.n_trees * internal, dtype=np.intp)
+        # Padding nodes sit above copies of one leaf, so their direction does not matter
+        self.threshold = np.full(self.n_trees * internal, np.inf, dtype=np.float32)
+        self.default_left = np.ones(self.n_trees * internal, dtype=bool)
+        self.leaf = np.zeros(self.n_trees * leaves, dtype=np.float32)
+        for t, tree in enumerate(trees):
+            self._fill(t, tree)
+        self.roots = np.arange(self.n_trees) * internal
+        # Flat index of each node's left child (right = left + 1); children of
+        # the deepest internal level index the leaf array instead
+        position = np.tile(np.arange(internal), self.n_trees)
+        tree = np.repeat(np.arange(self.n_trees), internal)
+        child = 2 * position + 1
+        self.left = np.where(child < internal, tree * internal + child, tree * leaves + child - internal)
+
+        base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+        self.base_margin = np.float32(np.log(base_score / (1 - base_score)))
+        self.n_features = int(learner["learner_model_param"]["num_feature"])
+
+    def _fill(self, t, tree):
+        left, right = tree["left_children"], tree["right_children"]
+        internal, leaves = self.internal, self.internal + 1
+        stack = [(0, 0, 0)]  # (node in the xgboost tree, heap position, depth)
+        while stack:
+            node, pos, depth = stack.pop()
+            if left[node] == -1:
+                # Leaf: its value is stored in split_conditions; fill the leaves under `pos`
+                span = 2 ** (self.depth - depth)
+                first = t * leaves + pos * span + (span - 1) - internal
+                self.leaf[first:first + span] = tree["split_conditions"][node]
+                continue
+            self.feature[t * internal + pos] = tree["split_indices"][node]
+            self.threshold[t * internal + pos] = tree["split_conditions"][node]
+            self.default_left[t * internal + pos] = bool(tree["default_left"][node])
+            stack.append((left[node], 2 * pos + 1, depth + 1))
+            stack.append((right[node], 2 * pos + 2, depth + 1))
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """(rows, trees) leaf values reached by the float32 rows of X."""
+        has_missing = np.isnan(X).any()
+        flat_X = X.ravel()
+        if len(X) == 1:
+            # One row: 1-D node arrays, no row offsets
+            node, row_offset = self.roots, 0
+        else:
+            node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+            row_offset = (np.arange(len(X)) * X.shape[1])[:, None]
+        for _ in range(self.depth):
+            x = flat_X.take(self.feature.take(node) + row_offset)
+            # NaN >= threshold is False, i.e. left; flip it where the default is right
+            go_right = x >= self.threshold.take(node)
+            if has_missing:
+                go_right |= np.isnan(x) & ~self.default_left.take(node)
+            node = self.left.take(node) + go_right
+        return self.leaf.take(node).reshape(len(X), self.n_trees)
+
+    def margin(self, X: np.ndarray) -> np.ndarray:
+        """
+        Raw scores (log-odds) for the float32 rows of X. Leaves are added one
+        tree at a time in float32 onto the base margin, the order XGBoost
+        uses, so the sums match it exactly.
+        """
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), BATCH_ROWS):
+            leaves = self.leaves(X[start:start + BATCH_ROWS])
+            leaves[:, 0] += self.base_margin
+            out[start:start + len(leaves)] = np.add.accumulate(leaves, axis=1)[:, -1]
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probability for the rows of X (any float dtype; cast to float32 like XGBoost)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows of {self.n_features} features, got shape {X.shape}")
+        return np.float32(1.0) / (np.float32(1.0) + np.exp(-self.margin(X)))
+
+
+def _tree_depth(tree) -> int:
+    left, right = tree["left_children"], tree["right_children"]
+    deepest, stack = 0, [(0, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if left[node] == -1:
+            deepest = max(deepest, depth)
+        else:
+            stack.extend([(left[node], depth + 1), (right[node], depth + 1)])
+    return deepest
+
+
+# ----------------------------------------------
+# Compiled Model (drop-in for ServedModel scoring)
+# ----------------------------------------------
+
+class CompiledModel:
+    """
+    Compiled preprocessor + trees with ServedModel's scoring interface
+    (features, threshold, missing_features, predict_proba, predict), so it
+    can replace a ServedModel in the HTTP service or an app.
+
+    Build with compile_model(); samplers (SMOTE etc.) are fit-time only
+    and skipped, as the pipeline itself skips them when predicting.
+    """
+
+    def __init__(self, name, features, preprocessor: CompiledPreprocessor, trees: CompiledTrees,
+                 threshold=0.5):
+        if preprocessor.n_features != trees.n_features:
+            raise CompileError(f"Preprocessor makes {preprocessor.n_features} features, "
+                               f"booster expects {trees.n_features}")
+        self.name = name
+        self.features = list(features)
+        self.preprocessor = preprocessor
+        self.trees = trees
+        self.threshold = threshold
+
+    def missing_features(self, record) -> list:
+        return [col for col in self.features if col not in record]
+
+    def transform(self, records) -> np.ndarray:
+        """Records (dicts or a DataFrame) -> model input matrix."""
+        if isinstance(records, pd.DataFrame):
+            missing = self.missing_features(records.columns)
+            if missing:
+                raise ValueError(f"Missing input columns: {', '.join(missing)}")
+            columns = {col: records[col].to_numpy() for col in self.features}
+            return self.preprocessor.transform(columns, len(records))
+        # Requests arrive as a few records at a time: encode each without pandas
+        rows = [self.preprocessor.transform_record(record) for record in records]
+        return np.array(rows).reshape(len(rows), self.preprocessor.n_features)
+
+    def predict_proba(self, records) -> np.ndarray:
+        return self.trees.predict_proba(self.transform(records))
+
+    def predict(self, records, threshold=None):
+        proba = self.predict_proba(records)
+        return proba, (proba >= (self.threshold if threshold is None else threshold)).astype(int)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path) -> "CompiledModel":
+        return joblib.load(path)
+
+
+def compile_model(model: ServedModel) -> CompiledModel:
+    """Compiles a loaded ServedModel whose pipeline ends in an XGBClassifier."""
+    steps = model.pipeline.steps
+    transformer, classifier = steps[0][1], steps[-1][1]
+    if not hasattr(classifier, "get_booster"):
+        raise CompileError(f"{model.name}: {type(classifier).__name__} is not an XGBoost model")
+    best = getattr(classifier, "best_iteration", None)
+    return CompiledModel(
+        model.name, model.features,
+        CompiledPreprocessor(transformer, model.value_maps),
+        CompiledTrees(classifier.get_booster(), None if best is None else best + 1),
+        threshold=model.threshold,
+    )
+
+
+# ----------------------------------------------
+# Parity Check & Benchmark
+# ----------------------------------------------
+
+def random_records(compiled: CompiledModel, n_rows: int, seed=0, missing_rate=0.01) -> pd.DataFrame:
+    """
+    Synthetic inputs spread over the fitted feature ranges: scaled columns
+    around center +- a few scales (with some NaN), categories drawn from the
+    encoder's known categories, passthrough columns 0/1.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for block in compiled.preprocessor.blocks:
+        kind, cols = block[0], block[1]
+        for i, col in enumerate(cols):
+            if kind == "onehot":
+                categories = [c for c, pos in block[2][i].items() if pos != -1]
+                data[col] = rng.choice(np.asarray(categories, dtype=object), n_rows)
+            elif kind == "scale":
+                center = 0.0 if block[2] is None else block[2][i]
+                scale = 1.0 if block[3] is None else block[3][i]
+                values = np.round(center + scale * rng.normal(0, 1.5, n_rows), 2)
+                values[rng.random(n_rows) < missing_rate] = np.nan
+                data[col] = values
+            else:
+                data[col] = rng.integers(0, 2, n_rows)
+    return pd.DataFrame(data)[compiled.features]
+
+
+def check_parity(compiled: CompiledModel, model: ServedModel, records, tolerance=PARITY_TOLERANCE) -> float:
+    """
+    Largest |compiled - pipeline| probability over `records`; raises
+    AssertionError when it exceeds `tolerance`.
+    """
+    expected = model.predict_proba(records)
+    actual = compiled.predict_proba(records)
+    worst = float(np.max(np.abs(expected - actual)))
+    if worst > tolerance:
+        raise AssertionError(f"{compiled.name}: compiled scorer differs from the pipeline by {worst:.2e} "
+                             f"(tolerance {tolerance:.0e})")
+    return worst
+
+
+def compile_checked(model: ServedModel, rows=2_000):
+    """
+    compile_model() plus a parity check on generated records; returns the
+    original model unchanged when its pipeline cannot be compiled.
+    """
+    try:
+        compiled = compile_model(model)
+    except CompileError:
+        return model
+    check_parity(compiled, model, random_records(compiled, rows))
+    return compiled
+
+
+def _per_call_us(fn, arg, repeat) -> float:
+    fn(arg)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def benchmark(compiled: CompiledModel, model: ServedModel, records: pd.DataFrame, repeat=200) -> dict:
+    """Single-record latency (us) and batch throughput (rows/s), compiled vs the served model."""
+    one = [records.iloc[0].to_dict()]
+    X = compiled.transform(records)
+    started = time.perf_counter()
+    compiled.predict_proba(records)
+    compiled_batch = time.perf_counter() - started
+    started = time.perf_counter()
+    model.predict_proba(records)
+    pipeline_batch = time.perf_counter() - started
+    return {
+        "single_us": {"served": _per_call_us(model.predict_proba, one, repeat),
+                      "compiled": _per_call_us(compiled.predict_proba, one, repeat * 10),
+                      "compiled_trees_only": _per_call_us(compiled.trees.predict_proba, X[:1], repeat * 10)},
+        "batch_rows_per_sec": {"pipeline": len(records) / pipeline_batch,
+                               "compiled": len(records) / compiled_batch},
+    }
+
+
+def main(argv=None):
+    xgboost_models = [name for name in MODEL_SPECS if name != "churn"]
+    parser = argparse.ArgumentParser(description="Compile an XGBoost pipeline into an array-based scorer.")
+    parser.add_argument("model", choices=xgboost_models)
+    parser.add_argument("--output", help="Where to save the compiled scorer (default: next to the .pkl)")
+    parser.add_argument("--rows", type=int, default=20_000, help="Generated records for the parity check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model)
+    compiled = compile_model(model)
+    records = random_records(compiled, args.rows, seed=args.seed)
+    worst = check_parity(compiled, model, records)
+    print(f"Parity: max |difference| {worst:.2e} over {args.rows:,} records "
+          f"({compiled.trees.n_trees} trees, depth {compiled.trees.depth})")
+
+    stats = benchmark(compiled, model, records)
+    single, batch = stats["single_us"], stats["batch_rows_per_sec"]
+    print(f"Single record: served model {single['served']:,.0f} us, compiled {single['compiled']:,.0f} us "
+          f"(trees only {single['compiled_trees_only']:,.0f} us)")
+    print(f"Batch: pipeline {batch['pipeline']:,.0f} rows/sec, compiled {batch['compiled']:,.0f} rows/sec")
+
+    output = args.output or Path(MODEL_SPECS[args.model]["path"]).with_suffix(".compiled.joblib")
+    compiled.save(output)
+    print(f"Compiled scorer saved as: {output}")
+
+
+if __name__ == "__main__":
+    # Run from the imported module so saved scorers pickle as model_serving.compiled.*, not __main__.*
+    from model_serving.compiled import main
+
+    main()
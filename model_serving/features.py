@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+
+# ----------------------------------------------
+# Fitted Preprocessing without pandas (batch columns & single records)
+# ----------------------------------------------
+# The ColumnTransformers of the Task 2 / 3 / 5 pipelines only scale,
+# one-hot encode and pass columns through. CompiledPreprocessor reads their
+# fitted parameters once and applies them to plain Python values, producing
+# exactly the float64 matrix ColumnTransformer.transform() would, without
+# building a DataFrame or running the sklearn transform chain.
+
+
+class CompileError(ValueError):
+    """Raised for pipeline steps or tree features the compiled scorer does not support."""
+
+
+class CompiledPreprocessor:
+    """
+    A fitted ColumnTransformer as plain arrays and lookup tables.
+
+    Supports the steps the Task 2 / 3 / 5 pipelines use: RobustScaler,
+    StandardScaler, OneHotEncoder (drop=None / "first" / explicit,
+    handle_unknown "ignore" or "error") and passthrough (including an
+    identity FunctionTransformer). Scaling is done in float64 with the same
+    operations as sklearn, so the features are bit-identical.
+
+    Two entry points:
+    - transform(columns, n_rows): many records, one NumPy pass per block
+    - transform_record(record): one record (dict, or tuple in `columns` order)
+      in a few microseconds of plain Python
+
+    Parameters:
+    - transformer: Fitted ColumnTransformer (dense output)
+    - value_maps: Optional {column: {raw value: model value}} applied to raw inputs first
+    """
+
+    def __init__(self, transformer, value_maps=None):
+        if getattr(transformer, "sparse_output_", False):
+            raise CompileError("Sparse ColumnTransformer output is not supported")
+        self.value_maps = value_maps or {}
+        self.columns = list(getattr(transformer, "feature_names_in_", []))
+        self.blocks = []
+        width = 0
+        for name, step, columns in transformer.transformers_:
+            if isinstance(step, str):
+                if step == "drop" or not len(columns):
+                    continue
+                if step != "passthrough":
+                    raise CompileError(f"Unsupported transformer '{name}': {step}")
+                block = ("pass", list(columns))
+            else:
+                block = _compile_step(name, step, list(columns))
+            self.blocks.append(block)
+            width += _block_width(block)
+        self.n_features = width
+        self._numeric_plan, self._category_plan = self._record_plan()
+
+    def transform(self, columns: dict, n_rows: int) -> np.ndarray:
+        """
+        Raw input columns -> (n_rows, n_features) float64 model input.
+
+        Parameters:
+        - columns: {input column: sequence of n_rows raw values}
+        - n_rows: Number of records
+        """
+        X = np.zeros((n_rows, self.n_features))
+        at = 0
+        for block in self.blocks:
+            kind, cols = block[0], block[1]
+            if kind == "onehot":
+                for col, lookup, width, strict in zip(cols, *block[2:]):
+                    positions = np.fromiter((lookup.get(v, -1) for v in self._raw(columns, col)), dtype=np.intp,
+                                            count=n_rows)
+                    unknown = positions == -1
+                    if strict and unknown.any():
+                        raise ValueError(f"Found unknown categories in column '{col}' during transform")
+                    # -1 = unknown value, -2 = dropped category: the row stays all zeros
+                    known = positions >= 0
+                    X[np.flatnonzero(known), at + positions[known]] = 1.0
+                    at += width
+                continue
+
+            values = np.column_stack([self._numeric(columns, col) for col in cols])
+            if kind == "scale":
+                center, scale = block[2], block[3]
+                if center is not None:
+                    values -= center
+                if scale is not None:
+                    values /= scale
+            X[:, at:at + len(cols)] = values
+            at += len(cols)
+        return X
+
+    def transform_record(self, record) -> np.ndarray:
+        """
+        One record -> its (n_features,) float64 model input, identical to
+        the row ColumnTransformer.transform() makes from a one-row DataFrame.
+
+        Parameters:
+        - record: {column: value}, or a tuple/list of values in `columns` order
+        """
+        if not isinstance(record, dict):
+            if len(record) != len(self.columns):
+                raise ValueError(f"Expected {len(self.columns)} values ({', '.join(self.columns)}), got {len(record)}")
+            record = dict(zip(self.columns, record))
+        maps = self.value_maps
+        row = [0.0] * self.n_features
+        try:
+            for col, at, center, scale in self._numeric_plan:
+                value = record[col]
+                if col in maps:
+                    value = maps[col].get(value, value)
+                # None is missing, as in a DataFrame column; the subtraction and
+                # division are sklearn's, done on Python floats (also IEEE float64)
+                row[at] = ((math.nan if value is None else float(value)) - center) / scale
+            for col, lookup, strict in self._category_plan:
+                value = record[col]
+                if col in maps:
+                    value = maps[col].get(value, value)
+                at = lookup.get(value, -1)
+                if at >= 0:
+                    row[at] = 1.0
+                elif at == -1 and strict:
+                    raise ValueError(f"Found unknown categories in column '{col}' during transform")
+        except KeyError:
+            missing = [col for col in self.columns if col not in record]
+            raise ValueError(f"Missing input columns: {', '.join(missing)}") from None
+        return np.array(row)
+
+    def _record_plan(self):
+        """Per input column: where its output goes and how it is computed (see transform_record)."""
+        numeric, categories = [], []
+        at = 0
+        for block in self.blocks:
+            kind, cols = block[0], block[1]
+            if kind == "onehot":
+                for col, lookup, width, strict in zip(cols, *block[2:]):
+                    # Absolute output positions; -2 (dropped category) stays as is
+                    categories.append((col, {c: at + i if i >= 0 else i for c, i in lookup.items()}, strict))
+                    at += width
+                continue
+            for i, col in enumerate(cols):
+                # Subtracting 0.0 / dividing by 1.0 leaves a float64 unchanged, so unscaled columns need no branch
+                center = 0.0 if kind != "scale" or block[2] is None else float(block[2][i])
+                scale = 1.0 if kind != "scale" or block[3] is None else float(block[3][i])
+                numeric.append((col, at, center, scale))
+                at += 1
+        return numeric, categories
+
+    def _raw(self, columns, col):
+        values = columns[col]
+        mapping = self.value_maps.get(col)
+        if mapping:
+            values = [mapping.get(v, v) for v in values]
+        return values
+
+    def _numeric(self, columns, col) -> np.ndarray:
+        return np.asarray(self._raw(columns, col), dtype=np.float64)
+
+
+def _compile_step(name, step, columns):
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, RobustScaler, StandardScaler
+
+    if isinstance(step, RobustScaler):
+        return ("scale", columns, step.center_ if step.with_centering else None,
+                step.scale_ if step.with_scaling else None)
+    if isinstance(step, StandardScaler):
+        return ("scale", columns, step.mean_ if step.with_mean else None, step.scale_ if step.with_std else None)
+    if isinstance(step, FunctionTransformer):
+        if step.func is not None:
+            raise CompileError(f"Transformer '{name}': only an identity FunctionTransformer can be compiled")
+        return ("pass", columns)
+    if isinstance(step, OneHotEncoder):
+        if getattr(step, "infrequent_categories_", None) is not None and any(
+                c is not None for c in step.infrequent_categories_):
+            raise CompileError(f"Transformer '{name}': infrequent-category grouping is not supported")
+        drop_idx = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(columns)
+        lookups, widths = [], []
+        for categories, dropped in zip(step.categories_, drop_idx):
+            kept = [c for i, c in enumerate(categories) if dropped is None or i != dropped]
+            lookup = {c: i for i, c in enumerate(kept)}
+            if dropped is not None:
+                lookup[categories[dropped]] = -2  # known, encoded as all zeros
+            lookups.append(lookup)
+            widths.append(len(kept))
+        strict = [step.handle_unknown == "error"] * len(columns)
+        return ("onehot", columns, lookups, widths, strict)
+    raise CompileError(f"Transformer '{name}': {type(step).__name__} is not supported")
+
+
+def _block_width(block) -> int:
+    return sum(block[3]) if block[0] == "onehot" else len(block[1])
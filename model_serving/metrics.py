@@ -0,0 +1,41 @@
+import threading
+
+import numpy as np
+
+# ----------------------------------------------
+# Rolling Latency / Batch-Size Statistics
+# ----------------------------------------------
+
+
+class RollingStats:
+    """
+    The last `window` samples of a measurement in a ring buffer, plus
+    lifetime count and sum. Percentiles are computed over the window.
+    """
+
+    def __init__(self, window=10_000):
+        self._samples = np.zeros(window)
+        self._next = 0
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, value: float):
+        self.add_many([value])
+
+    def add_many(self, values):
+        with self._lock:
+            for value in values:
+                self._samples[self._next] = value
+                self._next = (self._next + 1) % len(self._samples)
+                self.count += 1
+                self.total += value
+
+    def summary(self, percentiles=(50, 99)) -> dict:
+        with self._lock:
+            filled = self._samples[:min(self.count, len(self._samples))].copy()
+            count, total = self.count, self.total
+        summary = {"count": count, "mean": total / count if count else None}
+        for p in percentiles:
+            summary[f"p{p}"] = float(np.percentile(filled, p)) if len(filled) else None
+        return summary
@@ -0,0 +1,180 @@
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from model_serving.features import CompiledPreprocessor, CompileError
+
+# ----------------------------------------------
+# Served Models (paths, inputs, thresholds) & Loading
+# ----------------------------------------------
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# "example" holds the default inputs of each app's form. Its keys are the
+# columns the apps send, checked against the pipeline when it loads, and
+# the record itself is the warmup prediction.
+MODEL_SPECS = {
+    "credit_risk": {
+        "path": REPO_DIR / "Task2_Credit_Risk_Prediction" / "Task2_xgb_credit_risk_prediction.pkl",
+        "label": "Loan default risk",
+        "example": {
+            "Age": 30, "Income": 50000, "Home": "OWN", "Emp_length": 5, "Intent": "PERSONAL",
+            "Amount": 10000, "Rate": 12.5, "Status": 0, "Percent_income": 20.0, "Cred_length": 10,
+        },
+    },
+    "churn": {
+        "path": REPO_DIR / "Task3_Customer_Churn_Prediction" / "task3_churn_modeling.pkl",
+        "label": "Customer churn",
+        "example": {
+            "Geography": "France", "Gender": "Male", "CreditScore": 650, "Age": 35, "Tenure": 5,
+            "Balance": 50000.0, "EstimatedSalary": 70000.0, "NumOfProducts": 1, "HasCrCard": 0,
+            "IsActiveMember": 0,
+        },
+    },
+    "loan_acceptance": {
+        "path": REPO_DIR / "Task5_Loan_Acceptance_Prediction" / "task5_loan_acceptance_pred.pkl",
+        "label": "Loan offer acceptance",
+        "example": {
+            "balance": 0, "duration": 0, "campaign": 0, "pdays": -1, "previous": 0, "age": 30, "day": 15,
+            "job": "admin.", "marital": "married", "education": "primary", "contact": "cellular",
+            "month": "jan", "poutcome": "failure", "default": 0, "housing": 0, "loan": 0,
+        },
+        # The pipeline expects 0/1 here; the Task 5 app maps the yes/no answers the same way
+        "value_maps": {col: {"no": 0, "yes": 1} for col in ["default", "housing", "loan"]},
+    },
+}
+
+DEFAULT_THRESHOLD = 0.5
+# MODEL_SERVING_VALIDATE=1: check every fast-path feature row against the pipeline's own (pandas) transform
+VALIDATE_FAST_PATH = os.environ.get("MODEL_SERVING_VALIDATE", "0") == "1"
+
+
+class ModelLoadError(Exception):
+    """Raised when an artifact does not match its spec or fails its warmup prediction."""
+
+
+def threshold_for(name) -> float:
+    """Decision threshold of a model: <NAME>_THRESHOLD (e.g. CREDIT_RISK_THRESHOLD) or 0.5."""
+    return float(os.environ.get(f"{name.upper()}_THRESHOLD", MODEL_SPECS[name].get("threshold", DEFAULT_THRESHOLD)))
+
+
+class ServedModel:
+    """
+    One pipeline plus what is needed to score raw records with it.
+
+    Records given as dicts (or tuples in `features` order) skip pandas: the
+    fitted preprocessing is read out of the pipeline once (see
+    features.CompiledPreprocessor) and each record becomes the classifier's
+    input row directly. DataFrames, and pipelines whose preprocessing cannot
+    be read this way, go through the pipeline as usual.
+
+    Parameters:
+    - name: Key in MODEL_SPECS
+    - pipeline: Fitted sklearn / imblearn pipeline
+    - value_maps: Optional {column: {raw value: model value}} applied before scoring
+    - threshold: Probability at or above which the label is 1
+    - validate: Check each fast-path row against the pipeline's transform (raises AssertionError)
+    """
+
+    def __init__(self, name, pipeline, value_maps=None, threshold=DEFAULT_THRESHOLD, validate=VALIDATE_FAST_PATH):
+        self.name = name
+        self.pipeline = pipeline
+        self.features = list(pipeline.feature_names_in_)
+        self.value_maps = value_maps or {}
+        self.threshold = threshold
+        self.validate = validate
+        self.transformer, self.classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+        self.encoder = _record_encoder(pipeline, self.value_maps)
+
+    def missing_features(self, record) -> list:
+        return [col for col in self.features if col not in record]
+
+    def frame(self, records) -> pd.DataFrame:
+        """Records (dicts or a DataFrame) -> one DataFrame in the fitted column order."""
+        if isinstance(records, pd.DataFrame):
+            missing = self.missing_features(records.columns)
+            if missing:
+                raise ValueError(f"Missing input columns: {', '.join(missing)}")
+            frame = records[self.features]
+        else:
+            frame = pd.DataFrame.from_records(records, columns=self.features)
+        for col, mapping in self.value_maps.items():
+            frame[col] = pd.to_numeric(frame[col].replace(mapping))
+        return frame
+
+    def vector(self, record, validate=None) -> np.ndarray:
+        """
+        One record (dict, or tuple in `features` order) -> the classifier's
+        input row, without building a DataFrame.
+
+        Parameters:
+        - validate: Also run the pandas path and assert both rows are equal
+          (default: the model's `validate` setting)
+        """
+        row = self.encoder.transform_record(record)
+        if self.validate if validate is None else validate:
+            if not isinstance(record, dict):
+                record = dict(zip(self.features, record))
+            expected = self.transformer.transform(self.frame([record]))[0]
+            if not np.array_equal(row, expected, equal_nan=True):
+                raise AssertionError(f"{self.name}: fast preprocessing gave {row}, pipeline gave {expected}")
+        return row
+
+    def predict_proba(self, records) -> np.ndarray:
+        """Positive-class probability for each record, in one classifier call."""
+        if self.encoder is None or isinstance(records, pd.DataFrame):
+            return self.pipeline.predict_proba(self.frame(records))[:, 1]
+        rows = [self.vector(record) for record in records]
+        return self.classifier.predict_proba(np.array(rows).reshape(len(rows), self.encoder.n_features))[:, 1]
+
+    def predict(self, records, threshold=None):
+        """
+        (probabilities, labels) from a single predict_proba call; the label
+        is 1 where the probability is at or above the threshold.
+        """
+        proba = self.predict_proba(records)
+        return proba, (proba >= (self.threshold if threshold is None else threshold)).astype(int)
+
+
+def _record_encoder(pipeline, value_maps):
+    """
+    CompiledPreprocessor for the pipeline's first step, or None when the
+    fast path does not apply: the first step is not a supported
+    ColumnTransformer, or a step between it and the classifier transforms
+    at predict time (samplers such as SMOTE only act during fit).
+    """
+    steps = [step for _, step in pipeline.steps]
+    if len(steps) < 2 or not hasattr(steps[0], "transformers_"):
+        return None
+    if not all(hasattr(step, "fit_resample") for step in steps[1:-1]):
+        return None
+    try:
+        return CompiledPreprocessor(steps[0], value_maps)
+    except CompileError:
+        return None
+
+
+def load_model(name) -> ServedModel:
+    """
+    Loads one artifact, checks that it expects exactly the spec's input
+    columns, that the fast preprocessing path matches the pipeline on the
+    example record, and runs that record through the model once (warmup).
+    """
+    spec = MODEL_SPECS[name]
+    model = ServedModel(name, joblib.load(spec["path"]), spec.get("value_maps"), threshold_for(name))
+
+    expected = set(spec["example"])
+    if set(model.features) != expected:
+        raise ModelLoadError(
+            f"{name}: artifact expects columns {sorted(model.features)}, spec has {sorted(expected)}"
+        )
+    if model.encoder is not None:
+        model.vector(spec["example"], validate=True)
+    # First call pays for lazy initialisation inside the pipeline, not the first user
+    proba = model.predict_proba([spec["example"]])
+    if proba.shape != (1,) or not 0.0 <= proba[0] <= 1.0:
+        raise ModelLoadError(f"{name}: warmup prediction returned {proba!r}")
+    return model
@@ -0,0 +1,52 @@
+import threading
+
+from model_serving.models import MODEL_SPECS, ServedModel, load_model
+
+# ----------------------------------------------
+# Process-wide Model Registry (load once, lazily)
+# ----------------------------------------------
+
+
+class ModelRegistry:
+    """
+    Loads each model the first time it is asked for and keeps it for the
+    life of the process. Streamlit re-runs an app script on every widget
+    interaction but keeps imported modules, so the apps get their pipeline
+    from here instead of unpickling it on each rerun.
+
+    Loading goes through models.load_model(), which checks the input
+    columns and runs a warmup prediction, so a bad artifact fails on first
+    use rather than on a user's first click. Safe to call from several
+    threads: each model is loaded at most once.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._locks = {name: threading.Lock() for name in MODEL_SPECS}
+
+    def get(self, name) -> ServedModel:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._locks:
+            raise KeyError(f"Unknown model: {name} (known: {', '.join(MODEL_SPECS)})")
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name not in self._models:
+                self._models[name] = load_model(name)
+            return self._models[name]
+
+    def warm(self, names=None) -> dict:
+        """Loads `names` (default: every model) up front; returns {name: model}."""
+        return {name: self.get(name) for name in names or MODEL_SPECS}
+
+    def loaded(self) -> list:
+        return list(self._models)
+
+
+registry = ModelRegistry()
+
+
+def get_model(name) -> ServedModel:
+    """The process-wide instance of model `name` (see ModelRegistry)."""
+    return registry.get(name)
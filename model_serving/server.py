@@ -0,0 +1,205 @@
+import argparse
+import json
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from model_serving.batcher import BatchTooLargeError, MicroBatcher, QueueFullError
+from model_serving.compiled import compile_checked
+from model_serving.models import MODEL_SPECS
+from model_serving.registry import registry
+
+# ----------------------------------------------
+# HTTP Endpoints (stdlib only)
+# ----------------------------------------------
+# GET  /health                      -> {"status": "ok"}
+# GET  /models                      -> model names, labels and input features
+# GET  /metrics                     -> per-model latency p50/p99, batch sizes, queue depth
+# POST /predict/<model>             -> body: one record {...} or a list of records [...]
+#
+# Responses to /predict carry "probability" and "prediction" per record; the
+# prediction is 1 at or above the model's threshold (<MODEL>_THRESHOLD env
+# var, e.g. CREDIT_RISK_THRESHOLD; 0.5 by default). A full queue answers 503
+# with Retry-After, a list larger than the whole queue 413. Either way no
+# record of the request is scored.
+
+DEFAULT_TIMEOUT_S = 5.0
+# Feature values must be JSON scalars; objects and arrays are rejected with 400
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class InferenceService:
+    """
+    The loaded models, each behind its own MicroBatcher. Models come from
+    the process-wide registry and are all loaded (and warmed up) here,
+    before the server accepts requests.
+
+    Parameters:
+    - names: Models to serve (keys of MODEL_SPECS)
+    - max_batch / max_wait_ms / max_queue: MicroBatcher settings, per model
+    - timeout_s: Longest a request waits for its result
+    - compiled: Score the XGBoost models with the array-based compiled scorer
+      (see compiled.py; parity-checked against the pipeline at startup)
+    """
+
+    def __init__(self, names=None, max_batch=64, max_wait_ms=2.0, max_queue=1024, timeout_s=DEFAULT_TIMEOUT_S,
+                 compiled=False):
+        self.models = registry.warm(names)
+        if compiled:
+            self.models = {name: compile_checked(model) for name, model in self.models.items()}
+        self.batchers = {
+            name: MicroBatcher(model, max_batch=max_batch, max_wait_ms=max_wait_ms, max_queue=max_queue)
+            for name, model in self.models.items()
+        }
+        self.timeout_s = timeout_s
+        self.started = time.time()
+
+    def predict(self, name, records) -> list:
+        """
+        Scores records through the model's batcher.
+
+        Every record is checked before any is queued. Raises KeyError for an
+        unknown model, ValueError for records that are not objects, miss
+        features or hold non-scalar values, BatchTooLargeError /
+        QueueFullError when the records do not fit in the model's queue and
+        concurrent.futures.TimeoutError when results take too long.
+        """
+        model, batcher = self.models[name], self.batchers[name]
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(f"Record {i} is not a JSON object")
+            missing = model.missing_features(record)
+            if missing:
+                raise ValueError(f"Record {i} is missing features: {', '.join(missing)}")
+            invalid = [col for col in model.features if not isinstance(record[col], SCALAR_TYPES)]
+            if invalid:
+                raise ValueError(f"Record {i} has non-scalar values for: {', '.join(invalid)}")
+
+        futures = batcher.submit_many(records)
+        deadline = time.monotonic() + self.timeout_s
+        probabilities = [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        return [{"probability": p, "prediction": int(p >= model.threshold)} for p in probabilities]
+
+    def describe(self) -> dict:
+        return {
+            name: {"label": MODEL_SPECS[name]["label"], "features": model.features, "threshold": model.threshold,
+                   "scorer": type(model).__name__}
+            for name, model in self.models.items()
+        }
+
+    def metrics(self) -> dict:
+        return {
+            "uptime_s": time.time() - self.started,
+            "models": {name: batcher.stats() for name, batcher in self.batchers.items()},
+        }
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a busy client reuses its connection
+    protocol_version = "HTTP/1.1"
+    service: InferenceService = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/models":
+            self._send(200, self.service.describe())
+        elif self.path == "/metrics":
+            self._send(200, self.service.metrics())
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        prefix = "/predict/"
+        if not self.path.startswith(prefix):
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        name = self.path[len(prefix):]
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"null")
+        except (ValueError, UnicodeDecodeError):
+            self._send(400, {"error": "Body must be JSON"})
+            return
+        single = isinstance(body, dict)
+        records = [body] if single else body
+        if not isinstance(records, list) or not records:
+            self._send(400, {"error": "Body must be a record object or a non-empty list of records"})
+            return
+
+        try:
+            results = self.service.predict(name, records)
+        except KeyError:
+            self._send(404, {"error": f"Unknown model: {name}", "models": list(self.service.models)})
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+        except BatchTooLargeError as e:
+            self._send(413, {"error": str(e)})
+        except QueueFullError as e:
+            self._send(503, {"error": str(e)}, headers={"Retry-After": "1"})
+        except FutureTimeout:
+            self._send(504, {"error": "Timed out waiting for the model"})
+        except Exception as e:
+            self._send(500, {"error": f"Scoring failed: {e}"})
+        else:
+            self._send(200, {"model": name, **results[0]} if single else {"model": name, "results": results})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate at hundreds of requests/sec; see /metrics instead
+        pass
+
+
+class InferenceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog (5) resets connections when many clients connect at once
+    request_queue_size = 256
+
+
+def serve(service: InferenceService, host="127.0.0.1", port=8000) -> InferenceHTTPServer:
+    """Builds the HTTP server for `service` (call serve_forever() on it)."""
+    handler = type("BoundInferenceHandler", (InferenceHandler,), {"service": service})
+    return InferenceHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Task 2 / 3 / 5 classifiers over HTTP with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--models", nargs="+", choices=list(MODEL_SPECS), default=list(MODEL_SPECS))
+    parser.add_argument("--max-batch", type=int, default=64, help="Most records per model call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Longest a batch waits to fill")
+    parser.add_argument("--max-queue", type=int, default=1024, help="Queued requests per model before 503s")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="Seconds a request waits for its result")
+    parser.add_argument("--compiled", action="store_true", help="Use the compiled tree scorer for the XGBoost models")
+    args = parser.parse_args(argv)
+
+    service = InferenceService(args.models, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                               max_queue=args.max_queue, timeout_s=args.timeout, compiled=args.compiled)
+    server = serve(service, args.host, args.port)
+    print(f"Serving {', '.join(service.models)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# model_serving is imported as a package from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
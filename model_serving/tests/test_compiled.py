@@ -0,0 +1,34 @@
+import pytest
+
+from model_serving.compiled import PARITY_TOLERANCE, CompiledModel, check_parity, compile_model, random_records
+from model_serving.registry import get_model
+
+# The XGBoost pipelines; churn (random forest) is not compiled
+COMPILED_MODELS = ["credit_risk", "loan_acceptance"]
+
+
+@pytest.fixture(scope="module", params=COMPILED_MODELS)
+def models(request):
+    model = get_model(request.param)
+    return model, compile_model(model)
+
+
+def test_compiled_scorer_matches_the_pipeline(models):
+    model, compiled = models
+    records = random_records(compiled, 5_000, seed=1)
+    assert check_parity(compiled, model, records) <= PARITY_TOLERANCE
+
+
+def test_single_records_match_the_pipeline(models):
+    model, compiled = models
+    # Lists of record dicts, as the HTTP service and the apps send them
+    records = random_records(compiled, 200, seed=2).to_dict("records")
+    assert check_parity(compiled, model, records) <= PARITY_TOLERANCE
+
+
+def test_saved_scorer_loads_with_the_same_results(models, tmp_path):
+    model, compiled = models
+    path = tmp_path / f"{compiled.name}.compiled.joblib"
+    compiled.save(path)
+    records = random_records(compiled, 500, seed=3)
+    assert check_parity(CompiledModel.load(path), model, records) <= PARITY_TOLERANCE
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from model_serving.batcher import BatchTooLargeError, MicroBatcher, QueueFullError
+from model_serving.server import InferenceService, serve
+
+
+class StubModel:
+    """Scores every record 0.25; blocks scoring until `release` is set."""
+    name = "stub"
+    features = ["a", "b"]
+    threshold = 0.5
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.scored = []
+        self.batches = []
+
+    def missing_features(self, record):
+        return [col for col in self.features if col not in record]
+
+    def predict_proba(self, records):
+        self.release.wait()
+        self.scored.extend(records)
+        self.batches.append(len(records))
+        return [0.25] * len(records)
+
+
+@pytest.fixture
+def server():
+    model = StubModel()
+    # Built by hand: the real models would be loaded from their .pkl files
+    service = InferenceService.__new__(InferenceService)
+    service.models = {"stub": model}
+    service.batchers = {"stub": MicroBatcher(model, max_batch=4, max_wait_ms=1.0, max_queue=4)}
+    service.timeout_s = 5.0
+    httpd = serve(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield model, f"http://127.0.0.1:{httpd.server_address[1]}"
+    model.release.set()
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+
+def _post(url, body, path="/predict/stub"):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    request = urllib.request.Request(url + path, data=data, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def _blocked_batcher(max_queue):
+    """A batcher whose worker is stuck scoring a first record until `model.release` is set."""
+    model = StubModel()
+    model.release.clear()
+    batcher = MicroBatcher(model, max_batch=8, max_wait_ms=1.0, max_queue=max_queue)
+    first = batcher.submit({"a": 0, "b": 0})
+    while batcher.depth():
+        time.sleep(0.01)
+    return model, batcher, first
+
+
+def test_single_record_and_list_are_scored(server):
+    model, url = server
+    assert _post(url, {"a": 1, "b": "x"}) == (200, {"model": "stub", "probability": 0.25, "prediction": 0})
+    status, payload = _post(url, [{"a": 1, "b": "x"}, {"a": None, "b": True}])
+    assert status == 200
+    assert [r["probability"] for r in payload["results"]] == [0.25, 0.25]
+
+
+@pytest.mark.parametrize("path, body, expected", [
+    ("/predict/unknown", {"a": 1, "b": 2}, 404),
+    ("/predict/stub", {"a": 1}, 400),
+    ("/predict/stub", b"not json", 400),
+    ("/predict/stub", [], 400),
+])
+def test_bad_requests_are_rejected(server, path, body, expected):
+    model, url = server
+    status, payload = _post(url, body, path)
+    assert status == expected
+    assert "error" in payload
+    assert model.scored == []
+
+
+@pytest.mark.parametrize("value", [[1, 2], {"nested": 1}])
+def test_non_scalar_value_is_rejected_before_queueing(server, value):
+    model, url = server
+    status, payload = _post(url, [{"a": 1, "b": 2}, {"a": value, "b": 2}])
+    assert status == 400
+    assert "Record 1" in payload["error"]
+    assert model.scored == []
+
+
+def test_list_larger_than_the_queue_is_rejected_whole(server):
+    model, url = server
+    status, _ = _post(url, [{"a": i, "b": i} for i in range(5)])
+    assert status == 413
+    assert model.scored == []
+
+
+def test_waiting_requests_are_scored_in_one_batch():
+    model, batcher, first = _blocked_batcher(max_queue=16)
+    futures = [batcher.submit({"a": i, "b": i}) for i in range(1, 4)]
+    model.release.set()
+    assert [future.result(timeout=5) for future in [first, *futures]] == [0.25] * 4
+    batcher.close()
+    assert model.batches == [1, 3]
+
+
+def test_full_queue_rejects_new_requests():
+    model, batcher, first = _blocked_batcher(max_queue=2)
+    try:
+        batcher.submit({"a": 1, "b": 1})
+        batcher.submit({"a": 2, "b": 2})
+        with pytest.raises(QueueFullError):
+            batcher.submit({"a": 3, "b": 3})
+        assert batcher.stats()["rejected"] == 1
+    finally:
+        model.release.set()
+        first.result(timeout=5)
+        batcher.close()
+    assert [record["a"] for record in model.scored] == [0, 1, 2]
+
+
+def test_list_that_does_not_fit_queues_nothing():
+    model, batcher, first = _blocked_batcher(max_queue=3)
+    try:
+        batcher.submit_many([{"a": 1, "b": 1}, {"a": 2, "b": 2}])
+        with pytest.raises(QueueFullError):
+            batcher.submit_many([{"a": 3, "b": 3}, {"a": 4, "b": 4}])
+        with pytest.raises(BatchTooLargeError):
+            batcher.submit_many([{"a": 5, "b": 5}] * 4)
+        assert batcher.depth() == 2
+    finally:
+        model.release.set()
+        first.result(timeout=5)
+        batcher.close()
+    assert [record["a"] for record in model.scored] == [0, 1, 2]